@@ -7,10 +7,66 @@ import os
 import json
 import base64
 import asyncio
+import hashlib
+import time
 from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
 from groq import Groq
 import typer
 
+from config import Config
+from utils.database import get_db_connection
+
+# Pages packed into one Groq prompt; small batches keep per-page accuracy intact
+BATCH_SIZE = 4
+
+# Groq Batch API settings for analyses that can wait
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_POLL_INTERVAL = 30  # seconds
+BATCH_MAX_WAIT = 30 * 60  # seconds; a batch still running after this is cancelled and answered synchronously
+BATCH_FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+# Only elements whose text/name/placeholder/id/class/href match this are sent to the LLM
+LOGIN_HINT_PATTERN = r"log ?in|sign ?in|sign ?up|account|mobile|phone|otp|profile"
+MAX_ELEMENT_TEXT = 60
+MAX_HEADER_TEXT = 500
+
+# Attributes that identify a candidate element or form field across visits; positions, live text and
+# query strings change between runs and are left out of the analysis cache key
+CACHE_KEY_FIELDS = ('tag', 'id', 'className', 'type', 'name')
+
+LOGIN_SYSTEM_PROMPT = "You are an expert web scraping assistant that analyzes web pages to find login elements. Always respond with valid JSON."
+
+LOGIN_TASK = """TASK: Find the most likely login button or link on this page.
+
+Look for elements that:
+1. Have text like "Sign In", "Login", "Log In", "Account", "My Account"
+2. Are buttons or links in the header/navigation area
+3. Point to login-related URLs
+4. Are associated with login forms
+"""
+
+LOGIN_RESPONSE_FORMAT = """{
+    "login_found": true/false,
+    "login_element": {
+        "text": "exact text of login element",
+        "tag": "button/a/etc",
+        "selector_strategy": "text/class/id/position",
+        "recommended_selector": "CSS selector to use",
+        "coordinates": {"x": number, "y": number},
+        "confidence": "high/medium/low"
+    },
+    "reasoning": "explain why this element was chosen",
+    "alternatives": [
+        {
+            "text": "alternative element text",
+            "selector": "alternative selector",
+            "confidence": "medium/low"
+        }
+    ]
+}
+"""
+
 class AIVisionAgent:
     def __init__(self):
         self.groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
@@ -28,8 +84,16 @@ class AIVisionAgent:
             if screenshot_path:
                 await page.screenshot(path=screenshot_path, full_page=True)
             
+            # Reuse a cached analysis when the page structure has been seen recently
+            cache_key = self._cache_key(page_data)
+            cached = self._get_cached_analysis(cache_key)
+            if cached is not None:
+                typer.echo("♻️ Using cached AI analysis")
+                return cached
+            
             # Analyze with Groq LLM
             analysis = await self._analyze_with_groq(page_data)
+            self._store_analysis(cache_key, analysis)
             
             return analysis
             
@@ -44,42 +108,44 @@ class AIVisionAgent:
         title = await page.title()
         url = page.url
         
-        # Get all text content
-        body_text = await page.text_content('body')
-        
-        # Get HTML structure of interactive elements
+        # Get only the interactive elements that look login-related, filtered in the browser
         interactive_elements = await page.evaluate("""
-            () => {
+            ([pattern, maxText]) => {
+                const hint = new RegExp(pattern, 'i');
                 const elements = [];
-                const selectors = ['button', 'a', '[onclick]', '[role="button"]', 'input[type="submit"]'];
+                const selector = 'button, a, [onclick], [role="button"], input[type="submit"]';
                 
-                selectors.forEach(selector => {
-                    document.querySelectorAll(selector).forEach((el, index) => {
-                        const rect = el.getBoundingClientRect();
-                        const styles = window.getComputedStyle(el);
-                        
-                        if (rect.width > 0 && rect.height > 0 && styles.visibility !== 'hidden') {
-                            elements.push({
-                                tag: el.tagName.toLowerCase(),
-                                text: el.textContent.trim(),
-                                id: el.id || '',
-                                className: el.className || '',
-                                href: el.href || '',
-                                type: el.type || '',
-                                x: Math.round(rect.x),
-                                y: Math.round(rect.y),
-                                width: Math.round(rect.width),
-                                height: Math.round(rect.height),
-                                selector: selector,
-                                index: index
-                            });
-                        }
-                    });
+                document.querySelectorAll(selector).forEach(el => {
+                    const text = el.textContent.trim();
+                    const className = typeof el.className === 'string' ? el.className : '';
+                    const haystack = [text, el.name, el.placeholder, el.id, className, el.getAttribute('href')].join(' ');
+                    if (!hint.test(haystack)) {
+                        return;
+                    }
+                    
+                    const rect = el.getBoundingClientRect();
+                    const styles = window.getComputedStyle(el);
+                    
+                    if (rect.width > 0 && rect.height > 0 && styles.visibility !== 'hidden') {
+                        elements.push({
+                            tag: el.tagName.toLowerCase(),
+                            text: text.slice(0, maxText),
+                            id: el.id || '',
+                            name: el.getAttribute('name') || '',
+                            className: className,
+                            href: el.href || '',
+                            type: el.type || '',
+                            x: Math.round(rect.x),
+                            y: Math.round(rect.y),
+                            width: Math.round(rect.width),
+                            height: Math.round(rect.height)
+                        });
+                    }
                 });
                 
                 return elements;
             }
-        """)
+        """, [LOGIN_HINT_PATTERN, MAX_ELEMENT_TEXT])
         
         # Get form elements
         form_elements = await page.evaluate("""
@@ -111,7 +177,7 @@ class AIVisionAgent:
         
         # Get header/navigation area specifically
         header_content = await page.evaluate("""
-            () => {
+            (maxHeader) => {
                 const headerSelectors = ['header', '.header', 'nav', '.nav', '.navigation', '.top-bar'];
                 let headerText = '';
                 
@@ -122,26 +188,61 @@ class AIVisionAgent:
                     }
                 }
                 
-                return headerText.trim();
+                return headerText.replace(/\\s+/g, ' ').trim().slice(0, maxHeader);
             }
-        """)
+        """, MAX_HEADER_TEXT)
         
         return {
             'title': title,
             'url': url,
-            'body_text': body_text[:3000],  # Limit text length
             'interactive_elements': interactive_elements,
             'form_elements': form_elements,
             'header_content': header_content
         }
     
-    async def _analyze_with_groq(self, page_data: Dict) -> Dict:
-        """Use Groq LLM to analyze page data and find login elements"""
+    def _cache_key(self, page_data: Dict) -> str:
+        """Fingerprint the page's stable DOM structure for the analysis cache"""
+        url = urlsplit(page_data['url'])
+        fingerprint = [
+            url.netloc + url.path,
+            [[element.get(field, '') for field in CACHE_KEY_FIELDS] for element in page_data['interactive_elements']],
+            [
+                [[field_info.get(field, '') for field in CACHE_KEY_FIELDS] for field_info in form['inputs']]
+                for form in page_data['form_elements']
+            ]
+        ]
+        return hashlib.sha256(json.dumps(fingerprint, separators=(',', ':')).encode()).hexdigest()
+    
+    def _get_cached_analysis(self, key: str) -> Optional[Dict]:
+        """Return a cached analysis younger than the TTL, treating any cache error as a miss"""
+        try:
+            min_ts = int(time.time()) - Config.AI_CACHE_TTL_DAYS * 86400
+            with get_db_connection() as conn:
+                row = conn.execute(
+                    "SELECT analysis FROM ai_cache WHERE key = ? AND ts >= ?", (key, min_ts)
+                ).fetchone()
+            return json.loads(row['analysis']) if row else None
+        except Exception:
+            return None
+    
+    def _store_analysis(self, key: str, analysis: Dict):
+        """Cache a successful analysis; failures are never cached"""
+        if "error" in analysis:
+            return
         
-        prompt = f"""
-Analyze this web page data to find login-related elements. The page is from an e-commerce website (Ajio.com).
-
-PAGE INFORMATION:
+        try:
+            with get_db_connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO ai_cache (key, analysis, ts) VALUES (?, ?, ?)",
+                    (key, json.dumps(analysis), int(time.time()))
+                )
+                conn.commit()
+        except Exception as e:
+            typer.echo(f"⚠️ Could not cache AI analysis: {str(e)}")
+    
+    def _format_page_section(self, page_data: Dict) -> str:
+        """Format the extracted data of one page for an LLM prompt"""
+        return f"""PAGE INFORMATION:
 Title: {page_data['title']}
 URL: {page_data['url']}
 
@@ -149,65 +250,140 @@ HEADER/NAVIGATION CONTENT:
 {page_data['header_content']}
 
 INTERACTIVE ELEMENTS:
-{json.dumps(page_data['interactive_elements'], indent=2)}
+{json.dumps(page_data['interactive_elements'], separators=(',', ':'))}
 
 FORMS:
-{json.dumps(page_data['form_elements'], indent=2)}
-
-TASK: Find the most likely login button or link on this page.
-
-Look for elements that:
-1. Have text like "Sign In", "Login", "Log In", "Account", "My Account"
-2. Are buttons or links in the header/navigation area
-3. Point to login-related URLs
-4. Are associated with login forms
+{json.dumps(page_data['form_elements'], separators=(',', ':'))}
+"""
+    
+    def _parse_json_response(self, response_text: str):
+        """Strip markdown fences from an LLM response and parse it as JSON"""
+        if '```json' in response_text:
+            response_text = response_text.split('```json')[1].split('```')[0]
+        elif '```' in response_text:
+            response_text = response_text.split('```')[1]
+        
+        return json.loads(response_text)
+    
+    def _request_body(self, prompt: str, max_tokens: int) -> Dict:
+        """Chat completion request body for one login-analysis prompt"""
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": LOGIN_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.1,
+            "max_tokens": max_tokens
+        }
+    
+    def _complete(self, prompt: str, max_tokens: int) -> str:
+        """Send one login-analysis prompt to Groq and return the raw reply"""
+        response = self.groq_client.chat.completions.create(**self._request_body(prompt, max_tokens))
+        
+        return response.choices[0].message.content.strip()
+    
+    def _complete_each(self, prompts: List[str], max_tokens: int) -> List[Optional[str]]:
+        """Send prompts one by one, returning None for any that fail"""
+        replies = []
+        for prompt in prompts:
+            try:
+                replies.append(self._complete(prompt, max_tokens))
+            except Exception as e:
+                typer.echo(f"❌ Groq API error: {str(e)}")
+                replies.append(None)
+        return replies
+    
+    def _batch_output(self, file_id: str) -> str:
+        """Download a finished batch's output file as text"""
+        return self.groq_client.files.content(file_id).text()
+    
+    async def submit_batch(self, prompts: List[str], max_tokens: int = 1000, use_batch_api: bool = True) -> List[Optional[str]]:
+        """
+        Run prompts through Groq's Batch API and poll until done, falling back to synchronous calls.
+        The Groq client is blocking, so every call runs in a worker thread.
+        """
+        if not use_batch_api or not prompts:
+            return await asyncio.to_thread(self._complete_each, prompts, max_tokens)
+        
+        try:
+            lines = [
+                json.dumps({
+                    "custom_id": f"prompt-{i}",
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": self._request_body(prompt, max_tokens)
+                })
+                for i, prompt in enumerate(prompts)
+            ]
+            batch_file = await asyncio.to_thread(
+                self.groq_client.files.create,
+                file=("login_analysis.jsonl", "\n".join(lines).encode()),
+                purpose="batch"
+            )
+            batch = await asyncio.to_thread(
+                self.groq_client.batches.create,
+                completion_window=BATCH_COMPLETION_WINDOW,
+                endpoint="/v1/chat/completions",
+                input_file_id=batch_file.id
+            )
+            typer.echo(f"📨 Submitted Groq batch {batch.id} with {len(prompts)} prompt(s)")
+            
+            deadline = time.monotonic() + BATCH_MAX_WAIT
+            while batch.status not in BATCH_FINAL_STATUSES:
+                if time.monotonic() >= deadline:
+                    try:
+                        await asyncio.to_thread(self.groq_client.batches.cancel, batch.id)
+                    except Exception:
+                        pass  # an uncancelled batch still expires at the end of its window
+                    raise RuntimeError(f"batch {batch.id} still '{batch.status}' after {BATCH_MAX_WAIT}s")
+                
+                await asyncio.sleep(BATCH_POLL_INTERVAL)
+                batch = await asyncio.to_thread(self.groq_client.batches.retrieve, batch.id)
+            
+            if batch.status != "completed" or not batch.output_file_id:
+                raise RuntimeError(f"batch {batch.id} ended with status '{batch.status}'")
+            
+            replies = {}
+            for line in (await asyncio.to_thread(self._batch_output, batch.output_file_id)).splitlines():
+                record = json.loads(line)
+                body = (record.get("response") or {}).get("body") or {}
+                if body.get("choices"):
+                    replies[record["custom_id"]] = body["choices"][0]["message"]["content"].strip()
+            
+            results = [replies.get(f"prompt-{i}") for i in range(len(prompts))]
+            
+            # Anything the batch did not answer is retried synchronously
+            missing = [i for i, reply in enumerate(results) if reply is None]
+            retried = await asyncio.to_thread(self._complete_each, [prompts[i] for i in missing], max_tokens)
+            for i, reply in zip(missing, retried):
+                results[i] = reply
+            
+            return results
+            
+        except Exception as e:
+            typer.echo(f"⚠️ Groq batch failed, falling back to synchronous calls: {str(e)}")
+            return await asyncio.to_thread(self._complete_each, prompts, max_tokens)
+    
+    async def _analyze_with_groq(self, page_data: Dict) -> Dict:
+        """Use Groq LLM to analyze page data and find login elements"""
+        
+        prompt = f"""
+Analyze this web page data to find login-related elements. The page is from an e-commerce website (Ajio.com).
 
+{self._format_page_section(page_data)}
+{LOGIN_TASK}
 Respond with JSON in this exact format:
-{{
-    "login_found": true/false,
-    "login_element": {{
-        "text": "exact text of login element",
-        "tag": "button/a/etc",
-        "selector_strategy": "text/class/id/position",
-        "recommended_selector": "CSS selector to use",
-        "coordinates": {{"x": number, "y": number}},
-        "confidence": "high/medium/low"
-    }},
-    "reasoning": "explain why this element was chosen",
-    "alternatives": [
-        {{
-            "text": "alternative element text",
-            "selector": "alternative selector",
-            "confidence": "medium/low"
-        }}
-    ]
-}}
-
+{LOGIN_RESPONSE_FORMAT}
 If no login element is found, set login_found to false and explain why.
 """
 
         try:
-            response = self.groq_client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert web scraping assistant that analyzes web pages to find login elements. Always respond with valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-                max_tokens=1000
-            )
-            
-            response_text = response.choices[0].message.content.strip()
+            response_text = self._complete(prompt, max_tokens=1000)
             
             # Try to extract JSON from response
             try:
-                # Remove any markdown formatting
-                if '```json' in response_text:
-                    response_text = response_text.split('```json')[1].split('```')[0]
-                elif '```' in response_text:
-                    response_text = response_text.split('```')[1]
-                
-                analysis = json.loads(response_text)
+                analysis = self._parse_json_response(response_text)
                 return analysis
                 
             except json.JSONDecodeError:
@@ -218,6 +394,70 @@ If no login element is found, set login_found to false and explain why.
             typer.echo(f"❌ Groq API error: {str(e)}")
             return {"error": str(e)}
     
+    async def analyze_pages_for_login(self, pages: List, batch_size: int = BATCH_SIZE, use_batch_api: bool = False) -> List[Dict]:
+        """
+        Analyze several pages for login elements, packing each group of pages into one Groq prompt.
+        With use_batch_api the prompts go through Groq's Batch API, for runs that can wait.
+        """
+        try:
+            page_data = list(await asyncio.gather(*(self._extract_page_data(page) for page in pages)))
+        except Exception as e:
+            typer.echo(f"❌ AI batch analysis failed: {str(e)}")
+            return [{"error": str(e)} for _ in pages]
+        
+        keys = [self._cache_key(data) for data in page_data]
+        analyses = [self._get_cached_analysis(key) for key in keys]
+        
+        # Only pages without a cached analysis go to Groq
+        misses = [i for i, analysis in enumerate(analyses) if analysis is None]
+        groups = [misses[start:start + batch_size] for start in range(0, len(misses), batch_size)]
+        prompts = [self._build_batch_prompt([page_data[i] for i in group]) for group in groups]
+        replies = await self.submit_batch(prompts, max_tokens=1000 * batch_size, use_batch_api=use_batch_api)
+        
+        for group, reply in zip(groups, replies):
+            for i, analysis in zip(group, self._parse_batch_reply(reply, len(group))):
+                analyses[i] = analysis
+                self._store_analysis(keys[i], analysis)
+        
+        return analyses
+    
+    def _build_batch_prompt(self, page_data: List[Dict]) -> str:
+        """Build one prompt asking for an analysis of each page in page_data"""
+        sections = "\n".join(
+            f"### Page {i}\n{self._format_page_section(data)}"
+            for i, data in enumerate(page_data, 1)
+        )
+        return f"""
+Analyze the data of {len(page_data)} web pages to find login-related elements on each. The pages are from an e-commerce website (Ajio.com).
+
+{sections}
+{LOGIN_TASK.replace('on this page', 'on each page')}
+Respond with a JSON array containing exactly {len(page_data)} objects, one per page in page order, each in this exact format:
+{LOGIN_RESPONSE_FORMAT}
+If no login element is found on a page, set login_found to false for it and explain why.
+"""
+    
+    def _parse_batch_reply(self, response_text: Optional[str], count: int) -> List[Dict]:
+        """Split a batched reply into one analysis per page, by index"""
+        if response_text is None:
+            return [{"error": "No response from AI"} for _ in range(count)]
+        
+        try:
+            analyses = self._parse_json_response(response_text)
+        except json.JSONDecodeError:
+            typer.echo(f"⚠️ Failed to parse AI batch response as JSON: {response_text}")
+            return [{"error": "Invalid JSON response from AI", "raw_response": response_text} for _ in range(count)]
+        
+        if not isinstance(analyses, list):
+            analyses = [analyses]
+        
+        # Pages the model skipped get an error entry
+        return [
+            analyses[i] if i < len(analyses) and isinstance(analyses[i], dict)
+            else {"error": f"No analysis returned for page {i + 1}"}
+            for i in range(count)
+        ]
+    
     async def find_and_click_login(self, page) -> bool:
         """
         Main method to find and click login element using AI analysis
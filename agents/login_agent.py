@@ -16,23 +16,29 @@ class LoginAgent:
         self.headless = headless
         self.browser: Optional[Browser] = None
         self.page: Optional[Page] = None
+        self.owns_browser = True
         self.popup_handler = PopupHandler()
         
-    async def start_browser(self):
-        """Initialize Playwright browser and page"""
-        self.playwright = await async_playwright().start()
-        
-        # Launch browser with appropriate options
-        self.browser = await self.playwright.chromium.launch(
-            headless=self.headless,
-            args=['--no-sandbox', '--disable-setuid-sandbox']
-        )
+    async def start_browser(self, browser: Optional[Browser] = None):
+        """Initialize Playwright browser and page, reusing a shared browser if given"""
+        self.owns_browser = browser is None
+        if browser is None:
+            self.playwright = await async_playwright().start()
+            
+            # Launch browser with appropriate options
+            self.browser = await self.playwright.chromium.launch(
+                headless=self.headless,
+                args=['--no-sandbox', '--disable-setuid-sandbox']
+            )
+        else:
+            self.browser = browser
         
         # Create new page with realistic viewport
         self.page = await self.browser.new_page(
             viewport={'width': 1920, 'height': 1080},
             user_agent='Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         )
+        await self.popup_handler.install_context_policies(self.page.context)
         
         typer.echo("🌐 Browser started successfully")
     
@@ -221,6 +227,13 @@ class LoginAgent:
     
     async def close_browser(self):
         """Clean up browser resources"""
+        if not self.owns_browser:
+            # Closing the page also closes the context new_page() created for it
+            if self.page:
+                await self.page.close()
+            typer.echo("🔒 Browser page closed")
+            return
+        
         if self.browser:
             await self.browser.close()
         if hasattr(self, 'playwright'):
@@ -11,6 +11,7 @@ from datetime import datetime, timedelta
 import typer
 
 from utils.crawl4ai_helper import CrawlHelper
+from config import Config
 
 class OrderAgent:
     def __init__(self):
@@ -34,7 +35,9 @@ class OrderAgent:
         except:
             # Method 2: Direct URL navigation
             try:
-                await page.goto('https://www.ajio.com/my-account/orders', wait_until='networkidle')
+                # Fail fast on a stalled load instead of the 30s default, without changing the caller's page defaults
+                await page.goto('https://www.ajio.com/my-account/orders', wait_until='networkidle',
+                                timeout=Config.NAVIGATION_TIMEOUT)
             except:
                 typer.echo("❌ Could not navigate to orders page")
                 return False
@@ -61,15 +64,25 @@ class OrderAgent:
             
             typer.echo(f"📋 Found {len(order_elements)} order elements")
             
-            for i, order_element in enumerate(order_elements):
-                try:
-                    order_data = await self.extract_single_order(page, order_element, i)
-                    if order_data:
-                        orders.append(order_data)
-                        typer.echo(f"✅ Extracted order: {order_data.get('product_name', 'Unknown')}")
-                except Exception as e:
-                    typer.echo(f"⚠️ Failed to extract order {i}: {str(e)}")
-                    continue
+            # Extract cards concurrently so their browser round-trips overlap
+            semaphore = asyncio.Semaphore(Config.MAX_PARALLEL_ORDERS)
+            
+            async def extract_bounded(i, order_element):
+                async with semaphore:
+                    try:
+                        return await self.extract_single_order(page, order_element, i)
+                    except Exception as e:
+                        typer.echo(f"⚠️ Failed to extract order {i}: {str(e)}")
+                        return None
+            
+            results = await asyncio.gather(
+                *(extract_bounded(i, order_element) for i, order_element in enumerate(order_elements))
+            )
+            
+            for order_data in results:
+                if order_data:
+                    orders.append(order_data)
+                    typer.echo(f"✅ Extracted order: {order_data.get('product_name', 'Unknown')}")
         
         except Exception as e:
             typer.echo(f"❌ Error extracting orders: {str(e)}")
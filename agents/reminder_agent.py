@@ -4,17 +4,70 @@ Handles SQLite operations and deadline notifications.
 """
 
 import sqlite3
-from typing import List, Dict, Any, Optional
+from itertools import islice
+from typing import Iterable, Iterator, List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import typer
 
-from utils.database import get_db_connection
+from config import Config
+from utils.database import get_db_connection, drop_order_indexes, create_order_indexes
 # from models.order import Order  # No longer needed as we're using Flask-SQLAlchemy
 
+# One statement text shared by every insert so sqlite3's statement cache parses it once per connection.
+# An upsert updates a re-scraped order in place, where OR REPLACE would delete and re-insert the row
+UPSERT_ORDER_SQL = """
+    INSERT INTO orders (
+        order_id, product_name, price, image_url, delivery_status,
+        has_return_option, has_replace_option, return_deadline,
+        scraped_at, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(order_id) DO UPDATE SET
+        product_name = excluded.product_name,
+        price = excluded.price,
+        image_url = excluded.image_url,
+        delivery_status = excluded.delivery_status,
+        has_return_option = excluded.has_return_option,
+        has_replace_option = excluded.has_replace_option,
+        return_deadline = excluded.return_deadline,
+        scraped_at = excluded.scraped_at,
+        updated_at = excluded.updated_at
+"""
+
+# Rows built and handed to executemany at a time in save_orders; bounds memory for large imports
+SAVE_CHUNK_SIZE = 500
+
+# Imports larger than this rebuild the secondary indexes once instead of updating them per row
+BULK_INDEX_THRESHOLD = 100
+
+def _iso_deadline(deadline: Optional[str]) -> Optional[str]:
+    """Zero-padded YYYY-MM-DD form of a deadline, so text comparisons order it; unparseable values pass through"""
+    if not deadline:
+        return deadline
+    try:
+        return datetime.strptime(deadline, '%Y-%m-%d').date().isoformat()
+    except (TypeError, ValueError):
+        return deadline
+
 class ReminderAgent:
     def __init__(self):
         self.db_path = "orders.db"
     
+    @staticmethod
+    def _order_params(order_data: Dict[str, Any], updated_at: str) -> tuple:
+        """Bind parameters for UPSERT_ORDER_SQL, in column order"""
+        return (
+            order_data.get('order_id'),
+            order_data.get('product_name'),
+            order_data.get('price'),
+            order_data.get('image_url'),
+            order_data.get('delivery_status'),
+            order_data.get('has_return_option', False),
+            order_data.get('has_replace_option', False),
+            _iso_deadline(order_data.get('return_deadline')),
+            order_data.get('scraped_at'),
+            updated_at
+        )
+    
     def save_order(self, order_data: Dict[str, Any]) -> bool:
         """Save order to database"""
         try:
@@ -22,24 +75,7 @@ class ReminderAgent:
                 cursor = conn.cursor()
                 
                 # Insert or update order
-                cursor.execute("""
-                    INSERT OR REPLACE INTO orders (
-                        order_id, product_name, price, image_url, delivery_status,
-                        has_return_option, has_replace_option, return_deadline,
-                        scraped_at, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    order_data.get('order_id'),
-                    order_data.get('product_name'),
-                    order_data.get('price'),
-                    order_data.get('image_url'),
-                    order_data.get('delivery_status'),
-                    order_data.get('has_return_option', False),
-                    order_data.get('has_replace_option', False),
-                    order_data.get('return_deadline'),
-                    order_data.get('scraped_at'),
-                    datetime.now().isoformat()
-                ))
+                cursor.execute(UPSERT_ORDER_SQL, self._order_params(order_data, datetime.now().isoformat()))
                 
                 conn.commit()
                 typer.echo(f"💾 Saved order: {order_data.get('product_name')}")
@@ -49,36 +85,99 @@ class ReminderAgent:
             typer.echo(f"❌ Error saving order: {str(e)}")
             return False
     
+    def save_orders(self, orders: Iterable[Dict[str, Any]], chunk_size: int = SAVE_CHUNK_SIZE) -> bool:
+        """Save orders to database in a single transaction, written chunk by chunk"""
+        try:
+            updated_at = datetime.now().isoformat()
+            order_iter = iter(orders)
+            
+            # Peek just past the threshold to decide whether the indexes are rebuilt; dropping,
+            # writing and recreating all share one transaction so a failure rolls back to the
+            # previous rows with the indexes intact
+            rows = [self._order_params(order_data, updated_at) for order_data in islice(order_iter, BULK_INDEX_THRESHOLD + 1)]
+            bulk = len(rows) > BULK_INDEX_THRESHOLD
+            saved = 0
+            
+            with get_db_connection() as conn:
+                try:
+                    conn.execute("BEGIN")
+                    if bulk:
+                        drop_order_indexes(conn)
+                    while rows:
+                        conn.executemany(UPSERT_ORDER_SQL, rows)
+                        saved += len(rows)
+                        rows = [self._order_params(order_data, updated_at) for order_data in islice(order_iter, chunk_size)]
+                    if bulk:
+                        create_order_indexes(conn)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+            
+            if saved:
+                typer.echo(f"💾 Saved {saved} orders")
+            return True
+            
+        except Exception as e:
+            typer.echo(f"❌ Error saving orders: {str(e)}")
+            return False
+    
+    @staticmethod
+    def _row_to_order(row) -> Dict[str, Any]:
+        """Convert an orders row into an order dictionary"""
+        return {
+            'id': row[0],
+            'order_id': row[1],
+            'product_name': row[2],
+            'price': row[3],
+            'image_url': row[4],
+            'delivery_status': row[5],
+            'has_return_option': bool(row[6]),
+            'has_replace_option': bool(row[7]),
+            'return_deadline': row[8],
+            'scraped_at': row[9],
+            'updated_at': row[10]
+        }
+    
+    def iter_orders(self) -> Iterator[Dict[str, Any]]:
+        """Stream all orders from database, newest first, one row at a time"""
+        try:
+            with get_db_connection() as conn:
+                for row in conn.execute("SELECT * FROM orders ORDER BY scraped_at DESC"):
+                    yield self._row_to_order(row)
+                    
+        except Exception as e:
+            typer.echo(f"❌ Error fetching orders: {str(e)}")
+    
     def get_all_orders(self) -> List[Dict[str, Any]]:
         """Get all orders from database"""
+        return list(self.iter_orders())
+    
+    def get_orders_version(self) -> Optional[str]:
+        """Fingerprint of the orders table that changes whenever a row is added, updated or deleted"""
         try:
             with get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT * FROM orders ORDER BY scraped_at DESC")
-                rows = cursor.fetchall()
+                # The AUTOINCREMENT sequence only grows, every write stamps updated_at,
+                # and a delete lowers the count without touching the sequence
+                count, last_id, last_update = conn.execute("""
+                    SELECT COUNT(*), (SELECT seq FROM sqlite_sequence WHERE name = 'orders'), MAX(updated_at)
+                    FROM orders
+                """).fetchone()
+                return f"{count}-{last_id}-{last_update}"
                 
-                orders = []
-                for row in rows:
-                    order = {
-                        'id': row[0],
-                        'order_id': row[1],
-                        'product_name': row[2],
-                        'price': row[3],
-                        'image_url': row[4],
-                        'delivery_status': row[5],
-                        'has_return_option': bool(row[6]),
-                        'has_replace_option': bool(row[7]),
-                        'return_deadline': row[8],
-                        'scraped_at': row[9],
-                        'updated_at': row[10]
-                    }
-                    orders.append(order)
-                
-                return orders
+        except Exception as e:
+            typer.echo(f"❌ Error reading orders version: {str(e)}")
+            return None
+    
+    def count_orders(self) -> int:
+        """Count saved orders without loading any rows"""
+        try:
+            with get_db_connection() as conn:
+                return conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
                 
         except Exception as e:
-            typer.echo(f"❌ Error fetching orders: {str(e)}")
-            return []
+            typer.echo(f"❌ Error counting orders: {str(e)}")
+            return 0
     
     def get_orders_with_deadlines(self) -> List[Dict[str, Any]]:
         """Get orders that have return deadlines"""
@@ -93,36 +192,40 @@ class ReminderAgent:
                 """)
                 rows = cursor.fetchall()
                 
-                orders = []
-                for row in rows:
-                    order = {
-                        'id': row[0],
-                        'order_id': row[1],
-                        'product_name': row[2],
-                        'price': row[3],
-                        'image_url': row[4],
-                        'delivery_status': row[5],
-                        'has_return_option': bool(row[6]),
-                        'has_replace_option': bool(row[7]),
-                        'return_deadline': row[8],
-                        'scraped_at': row[9],
-                        'updated_at': row[10]
-                    }
-                    orders.append(order)
-                
-                return orders
+                return [self._row_to_order(row) for row in rows]
                 
         except Exception as e:
             typer.echo(f"❌ Error fetching orders with deadlines: {str(e)}")
             return []
     
+    def get_orders_due_by(self, cutoff: str) -> List[Dict[str, Any]]:
+        """Get orders whose return deadline (YYYY-MM-DD) falls on or before cutoff"""
+        try:
+            with get_db_connection() as conn:
+                # ISO dates compare correctly as text, so this range scan can use idx_orders_deadline
+                rows = conn.execute("""
+                    SELECT * FROM orders
+                    WHERE return_deadline IS NOT NULL
+                    AND return_deadline != ''
+                    AND return_deadline <= ?
+                    ORDER BY return_deadline ASC
+                """, (cutoff,)).fetchall()
+                
+                return [self._row_to_order(row) for row in rows]
+                
+        except Exception as e:
+            typer.echo(f"❌ Error fetching orders due by {cutoff}: {str(e)}")
+            return []
+    
     def check_reminders(self) -> List[Dict[str, Any]]:
         """Check for orders with approaching return deadlines"""
         urgent_orders = []
         
         try:
-            orders = self.get_orders_with_deadlines()
             current_date = datetime.now().date()
+            threshold = Config.URGENT_DEADLINE_THRESHOLD_DAYS
+            cutoff = (current_date + timedelta(days=threshold)).isoformat()
+            orders = self.get_orders_due_by(cutoff)
             
             for order in orders:
                 if order['return_deadline']:
@@ -130,7 +233,7 @@ class ReminderAgent:
                         deadline_date = datetime.strptime(order['return_deadline'], '%Y-%m-%d').date()
                         days_until_deadline = (deadline_date - current_date).days
                         
-                        if days_until_deadline <= 2:
+                        if days_until_deadline <= threshold:
                             order['days_until_deadline'] = days_until_deadline
                             urgent_orders.append(order)
                             
@@ -10,6 +10,29 @@ from playwright.async_api import Page
 import typer
 import os
 
+# Match score weights for intent terms found in an order's text
+COLOR_WEIGHT = 2.0
+PRODUCT_WEIGHT = 3.0
+KEYWORD_WEIGHT = 0.5
+ACTION_BUTTON_WEIGHT = 1.0
+MIN_KEYWORD_LENGTH = 4
+
+ACTION_BUTTON_WORDS = {
+    'return': ('return',),
+    'replace': ('replace', 'exchange')
+}
+
+def score_order_text(order_text_lower: str, intent: Dict[str, Any]) -> float:
+    """Score the intent's colors, products and keywords against lowercased order text"""
+    return (
+        COLOR_WEIGHT * sum(color in order_text_lower for color in intent.get('colors', []))
+        + PRODUCT_WEIGHT * sum(product in order_text_lower for product in intent.get('products', []))
+        + KEYWORD_WEIGHT * sum(
+            len(keyword) >= MIN_KEYWORD_LENGTH and keyword in order_text_lower
+            for keyword in intent.get('keywords', [])
+        )
+    )
+
 class ReturnAgent:
     def __init__(self):
         self.groq_api_key = os.getenv("GROQ_API_KEY", "")
@@ -112,37 +135,19 @@ class ReturnAgent:
         try:
             # Get order text content
             order_text = await order_element.inner_text()
-            order_text_lower = order_text.lower()
-            
-            # Score based on color matches
-            for color in intent.get('colors', []):
-                if color in order_text_lower:
-                    score += 2.0
-            
-            # Score based on product type matches
-            for product in intent.get('products', []):
-                if product in order_text_lower:
-                    score += 3.0
+            score = score_order_text(order_text.lower(), intent)
             
-            # Score based on general keyword matches
-            for keyword in intent.get('keywords', []):
-                if len(keyword) > 3 and keyword in order_text_lower:
-                    score += 0.5
-            
-            # Check if return/replace action is available
-            buttons = await order_element.query_selector_all('button, a')
-            has_action_button = False
-            
-            for button in buttons:
-                button_text = await button.inner_text()
-                button_text_lower = button_text.lower()
-                
-                if intent['action'] == 'return' and 'return' in button_text_lower:
-                    has_action_button = True
-                    score += 1.0
-                elif intent['action'] == 'replace' and ('replace' in button_text_lower or 'exchange' in button_text_lower):
-                    has_action_button = True
-                    score += 1.0
+            # Check if return/replace action is available; all button labels come back in one round trip
+            button_texts = await order_element.eval_on_selector_all(
+                'button, a', 'elements => elements.map(element => element.innerText)'
+            )
+            action_words = ACTION_BUTTON_WORDS.get(intent['action'], ())
+            action_buttons = sum(
+                any(word in (button_text or '').lower() for word in action_words)
+                for button_text in button_texts
+            )
+            has_action_button = action_buttons > 0
+            score += ACTION_BUTTON_WEIGHT * action_buttons
             
             # Penalize if action is not available
             if not has_action_button:
@@ -6,7 +6,7 @@ Includes realistic browser behavior, random delays, and proxy rotation.
 import asyncio
 import random
 import typer
-from playwright.async_api import async_playwright, Page, Browser
+from playwright.async_api import async_playwright, Page, Browser, BrowserContext
 from typing import Optional, Dict, Any
 import time
 
@@ -14,16 +14,56 @@ from utils.popup_handler import PopupHandler
 from config import Config
 
 class StealthLoginAgent:
+    # Enhanced browser arguments to avoid detection
+    BROWSER_ARGS = [
+        '--no-sandbox',
+        '--disable-setuid-sandbox',
+        '--disable-blink-features=AutomationControlled',
+        '--disable-features=VizDisplayCompositor',
+        '--disable-extensions',
+        '--disable-plugins',
+        '--disable-gpu',
+        '--disable-dev-shm-usage',
+        '--disable-background-timer-throttling',
+        '--disable-backgrounding-occluded-windows',
+        '--disable-renderer-backgrounding',
+        '--disable-web-security',
+        '--disable-features=TranslateUI',
+        '--disable-ipc-flooding-protection',
+        '--enable-features=NetworkService,NetworkServiceInProcess',
+        '--force-color-profile=srgb',
+        '--metrics-recording-only',
+        '--use-mock-keychain',
+        '--disable-background-networking',
+        '--disable-default-apps',
+        '--disable-extensions',
+        '--disable-sync',
+        '--disable-translate',
+        '--hide-scrollbars',
+        '--mute-audio',
+        '--no-first-run',
+        '--safebrowsing-disable-auto-update',
+        '--disable-client-side-phishing-detection',
+        '--disable-component-update',
+        '--disable-hang-monitor',
+        '--disable-prompt-on-repost',
+        '--disable-background-timer-throttling',
+        '--disable-backgrounding-occluded-windows',
+        '--disable-renderer-backgrounding',
+        '--disable-features=TranslateUI',
+        '--disable-ipc-flooding-protection'
+    ]
+    
     def __init__(self, headless: bool = True):
         self.headless = headless
         self.browser: Optional[Browser] = None
         self.page: Optional[Page] = None
+        self.context: Optional[BrowserContext] = None
+        self.owns_browser = True
         self.popup_handler = PopupHandler()
         
-    async def start_browser(self):
-        """Initialize Playwright browser with stealth configurations"""
-        self.playwright = await async_playwright().start()
-        
+    async def start_browser(self, browser: Optional[Browser] = None):
+        """Initialize Playwright browser with stealth configurations, reusing a shared browser if given"""
         # Random user agent selection
         user_agents = [
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -35,53 +75,19 @@ class StealthLoginAgent:
         
         selected_ua = random.choice(user_agents)
         
-        # Enhanced browser arguments to avoid detection
-        browser_args = [
-            '--no-sandbox',
-            '--disable-setuid-sandbox',
-            '--disable-blink-features=AutomationControlled',
-            '--disable-features=VizDisplayCompositor',
-            '--disable-extensions',
-            '--disable-plugins',
-            '--disable-gpu',
-            '--disable-dev-shm-usage',
-            '--disable-background-timer-throttling',
-            '--disable-backgrounding-occluded-windows',
-            '--disable-renderer-backgrounding',
-            '--disable-web-security',
-            '--disable-features=TranslateUI',
-            '--disable-ipc-flooding-protection',
-            '--enable-features=NetworkService,NetworkServiceInProcess',
-            '--force-color-profile=srgb',
-            '--metrics-recording-only',
-            '--use-mock-keychain',
-            '--disable-background-networking',
-            '--disable-default-apps',
-            '--disable-extensions',
-            '--disable-sync',
-            '--disable-translate',
-            '--hide-scrollbars',
-            '--mute-audio',
-            '--no-first-run',
-            '--safebrowsing-disable-auto-update',
-            '--disable-client-side-phishing-detection',
-            '--disable-component-update',
-            '--disable-hang-monitor',
-            '--disable-prompt-on-repost',
-            '--disable-background-timer-throttling',
-            '--disable-backgrounding-occluded-windows',
-            '--disable-renderer-backgrounding',
-            '--disable-features=TranslateUI',
-            '--disable-ipc-flooding-protection'
-        ]
-        
-        self.browser = await self.playwright.chromium.launch(
-            headless=self.headless,
-            args=browser_args
-        )
+        # Open a context in the shared browser, or launch a dedicated one
+        self.owns_browser = browser is None
+        if browser is None:
+            self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.chromium.launch(
+                headless=self.headless,
+                args=self.BROWSER_ARGS
+            )
+        else:
+            self.browser = browser
         
         # Create browser context with additional stealth settings
-        context = await self.browser.new_context(
+        context = self.context = await self.browser.new_context(
             viewport={'width': 1920, 'height': 1080},
             user_agent=selected_ua,
             locale='en-US',
@@ -89,6 +95,7 @@ class StealthLoginAgent:
             geolocation={'latitude': 40.7128, 'longitude': -74.0060},
             permissions=['geolocation']
         )
+        await self.popup_handler.install_context_policies(context)
         
         # Add stealth scripts to avoid detection
         await context.add_init_script("""
@@ -500,6 +507,12 @@ class StealthLoginAgent:
     
     async def close_browser(self):
         """Clean up browser resources"""
+        if not self.owns_browser:
+            # Shared browser stays up for other agents; only our context goes
+            if self.context:
+                await self.context.close()
+            return
+        
         if self.browser:
             await self.browser.close()
         if hasattr(self, 'playwright'):
@@ -18,6 +18,7 @@ class Config:
     BROWSER_TIMEOUT = 30000  # 30 seconds
     PAGE_LOAD_TIMEOUT = 60000  # 60 seconds
     ELEMENT_TIMEOUT = 10000  # 10 seconds
+    NAVIGATION_TIMEOUT = 15000  # 15 seconds
     
     # Database settings
     DATABASE_PATH = "orders.db"
@@ -28,6 +29,7 @@ class Config:
     POPUP_WAIT_DELAY = 2  # seconds
     PAGE_SCROLL_DELAY = 1  # seconds
     ELEMENT_INTERACTION_DELAY = 0.5  # seconds
+    MAX_PARALLEL_ORDERS = 3  # order cards extracted concurrently
     
     # Return deadline settings
     DEFAULT_RETURN_PERIOD_DAYS = 7
@@ -36,6 +38,7 @@ class Config:
     # API settings
     GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
     GROQ_MODEL = "llama3-8b-8192"
+    AI_CACHE_TTL_DAYS = 7  # cached login analyses expire after a week
     
     # User agent strings
     USER_AGENTS = [
@@ -4,10 +4,19 @@ Defines the schema and validation for order information.
 """
 
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, date
 import json
 
+@lru_cache(maxsize=256)
+def _parse_deadline(deadline: str) -> Optional[date]:
+    """Parse a YYYY-MM-DD deadline string, returning None if it is malformed"""
+    try:
+        return datetime.strptime(deadline, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
 @dataclass
 class Order:
     """Order data model with validation and serialization capabilities"""
@@ -80,20 +89,21 @@ class Order:
         data = json.loads(json_str)
         return cls.from_dict(data)
     
+    def _parsed_deadline(self) -> Optional[date]:
+        """Get the return deadline as a date, reusing earlier parses of the same string"""
+        if not self.return_deadline:
+            return None
+        return _parse_deadline(self.return_deadline)
+    
     def is_returnable(self) -> bool:
         """Check if order is eligible for return"""
-        if not self.has_return_option:
-            return False
-        
-        if not self.return_deadline:
+        if not self.has_return_option or not self.return_deadline:
             return False
         
-        try:
-            deadline_date = datetime.strptime(self.return_deadline, '%Y-%m-%d').date()
-            current_date = datetime.now().date()
-            return current_date <= deadline_date
-        except ValueError:
+        deadline_date = self._parsed_deadline()
+        if deadline_date is None:
             return False
+        return date.today() <= deadline_date
     
     def is_replaceable(self) -> bool:
         """Check if order is eligible for replacement"""
@@ -101,15 +111,10 @@ class Order:
     
     def days_until_deadline(self) -> Optional[int]:
         """Get number of days until return deadline"""
-        if not self.return_deadline:
-            return None
-        
-        try:
-            deadline_date = datetime.strptime(self.return_deadline, '%Y-%m-%d').date()
-            current_date = datetime.now().date()
-            return (deadline_date - current_date).days
-        except ValueError:
+        deadline_date = self._parsed_deadline()
+        if deadline_date is None:
             return None
+        return (deadline_date - date.today()).days
     
     def is_deadline_urgent(self, threshold_days: int = 2) -> bool:
         """Check if return deadline is approaching within threshold"""
@@ -149,7 +154,7 @@ class Order:
         if self.delivery_status:
             summary += f" ({self.delivery_status})"
         
-        if self.return_deadline and self.is_returnable():
+        if self.is_returnable():
             days_left = self.days_until_deadline()
             if days_left is not None:
                 if days_left < 0:
@@ -176,11 +181,8 @@ class Order:
         if not self.product_name or not self.product_name.strip():
             errors.append("Product name cannot be empty")
         
-        if self.return_deadline:
-            try:
-                datetime.strptime(self.return_deadline, '%Y-%m-%d')
-            except ValueError:
-                errors.append("Return deadline must be in YYYY-MM-DD format")
+        if self.return_deadline and self._parsed_deadline() is None:
+            errors.append("Return deadline must be in YYYY-MM-DD format")
         
         if self.scraped_at:
             try:
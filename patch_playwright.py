@@ -0,0 +1,62 @@
+"""
+Optional Playwright patch that trims per-call stack introspection.
+Set PW_INSPECT_STACK=0 before importing Playwright to resolve each call's API name with a short frame walk
+instead of walking and recording every Python frame on every API call.
+"""
+
+import os
+import sys
+
+# Playwright modules that import _capture_stack_trace by name and so need patching alongside _connection
+_STACK_TRACE_MODULES = ['_connection', '_network', '_sync_base', '_disposable']
+
+# Resolved once; the package __init__ is tiny and does not load Playwright's implementation
+try:
+    import playwright
+    _PLAYWRIGHT_PATH = os.path.dirname(playwright.__file__)
+    _MAPPING_FILE = os.path.join(_PLAYWRIGHT_PATH, '_impl', '_impl_to_api_mapping.py')
+except ImportError:
+    _PLAYWRIGHT_PATH = _MAPPING_FILE = None
+
+def _frame_stack_trace():
+    """Return stack info, stopping at the first caller outside Playwright once an API frame is seen"""
+    # Skip this helper and the caller that only captures the stack, as Playwright's own walk does
+    frame = sys._getframe(2)
+    api_name = ""
+    user_frame = None
+    while frame is not None:
+        code = frame.f_code
+        filename = code.co_filename
+        if filename == _MAPPING_FILE:
+            pass
+        elif filename.startswith(_PLAYWRIGHT_PATH):
+            # co_qualname gives "Page.goto" without touching f_locals
+            api_name = code.co_qualname
+        else:
+            if user_frame is None:
+                user_frame = {"file": filename, "line": frame.f_lineno, "column": 0, "function": code.co_qualname}
+            if api_name:
+                break
+        frame = frame.f_back
+    
+    return {"frames": [user_frame] if user_frame else [], "apiName": api_name, "title": None}
+
+def apply_patch() -> bool:
+    """Replace Playwright's stack capture when PW_INSPECT_STACK=0"""
+    if os.getenv('PW_INSPECT_STACK', '1') != '0':
+        return False
+    
+    try:
+        from playwright import _impl
+        for name in _STACK_TRACE_MODULES:
+            __import__(f'playwright._impl.{name}')
+    except ImportError:
+        return False
+    
+    for name in _STACK_TRACE_MODULES:
+        module = getattr(_impl, name)
+        if hasattr(module, '_capture_stack_trace'):
+            module._capture_stack_trace = _frame_stack_trace
+    return True
+
+PATCHED = apply_patch()
@@ -6,6 +6,15 @@ Quick debug script to identify current Ajio.com login elements
 import asyncio
 from playwright.async_api import async_playwright
 
+# Login selectors probed on every run; locators built from these reuse
+# Playwright's parsed selector pipeline instead of re-parsing per query
+_LOGIN_LOCATORS = [
+    'text="Sign In"',
+    'text="Login"',
+    'text="LOG IN"',
+    'text="SIGN IN"',
+]
+
 async def quick_ajio_check():
     playwright = await async_playwright().start()
     
@@ -57,24 +66,24 @@ async def quick_ajio_check():
         print(f"📱 Nav element: {'✅' if nav_exists else '❌'}")
         
         # Try to find login button with simple text search
-        simple_selectors = [
-            'text="Sign In"',
-            'text="Login"',
-            'text="LOG IN"',
-            'text="SIGN IN"',
-        ]
+        async def probe(locator):
+            return await locator.count(), await locator.first.is_visible()
+        
+        probes = await asyncio.gather(
+            *(probe(page.locator(selector)) for selector in _LOGIN_LOCATORS),
+            return_exceptions=True
+        )
         
-        for selector in simple_selectors:
-            try:
-                element = await page.query_selector(selector)
-                if element:
-                    is_visible = await element.is_visible()
-                    print(f"🎯 Found '{selector}': visible={is_visible}")
-                    if is_visible:
-                        print("✅ This looks promising!")
-                        return True
-            except:
-                pass
+        # Report every hit, hidden ones included, in selector order
+        for selector, result in zip(_LOGIN_LOCATORS, probes):
+            if isinstance(result, Exception):
+                continue
+            count, is_visible = result
+            if count:
+                print(f"🎯 Found '{selector}': visible={is_visible}")
+                if is_visible:
+                    print("✅ This looks promising!")
+                    return True
         
         print("\n💡 Manual inspection needed:")
         print("1. Look at the browser window that opened")
@@ -7,6 +7,7 @@ import asyncio
 import threading
 from datetime import datetime
 from flask import render_template, jsonify, request, redirect, url_for, flash
+from sqlalchemy import select
 from app import app, db
 from models_flask import Order, Session, Reminder
 from agents.login_agent import LoginAgent
@@ -15,6 +16,17 @@ from agents.return_agent import ReturnAgent
 from agents.reminder_agent import ReminderAgent
 from config import Config
 
+# Orders listing statement, built once so SQLAlchemy's compiled cache is hit
+# on every request; rows are streamed in batches instead of loaded up front
+ORDERS_PAGE_STMT = (
+    select(Order)
+    .order_by(Order.scraped_at.desc())
+    .execution_options(yield_per=100)
+)
+
+# Shared by the request handlers; it keeps no per-request state
+_reminder_agent = ReminderAgent()
+
 # Global variables to track automation status
 automation_status = {
     'running': False,
@@ -89,12 +101,11 @@ def api_reminders():
     """API endpoint to check reminders"""
     try:
         # Get orders with upcoming return deadlines
-        reminder_agent = ReminderAgent()
-        reminders = reminder_agent.check_reminders()
+        reminders = _reminder_agent.check_reminders() or []
         
         return jsonify({
-            'reminders': reminders or [],
-            'count': len(reminders) if reminders else 0
+            'reminders': reminders,
+            'count': len(reminders)
         })
         
     except Exception as e:
@@ -227,8 +238,11 @@ async def run_automation_workflow(phone_number, command, headless):
         if orders:
             automation_status['message'] = f'Found {len(orders)} orders, saving to database...'
             
+            # Drop rows the scraper could not identify in a single pass up front
+            valid_orders = [o for o in orders if o.get('order_id') and o.get('product_name')]
+            
             # Save orders to database
-            for order_data in orders:
+            for order_data in valid_orders:
                 existing_order = Order.query.filter_by(order_id=order_data.get('order_id')).first()
                 
                 if existing_order:
@@ -277,7 +291,8 @@ async def run_automation_workflow(phone_number, command, headless):
 @app.route('/orders')
 def orders_page():
     """Orders management page"""
-    orders = Order.query.order_by(Order.scraped_at.desc()).all()
+    # Streamed result; the template must iterate it exactly once
+    orders = db.session.scalars(ORDERS_PAGE_STMT)
     return render_template('orders.html', orders=orders)
 
 @app.route('/automation')
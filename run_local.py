@@ -16,6 +16,8 @@ from agents.reminder_agent import ReminderAgent
 from utils.database import init_database
 from config import Config
 
+SUMMARY_FIELDS = ('product_name', 'price', 'delivery_status', 'return_deadline')
+
 app = typer.Typer(help="Ajio.com Multi-Agent Browser Automation System")
 
 async def main_workflow(
@@ -56,8 +58,7 @@ async def main_workflow(
             typer.echo(f"✅ Found {len(orders)} orders")
             
             # Save orders to database
-            for order in orders:
-                reminder_agent.save_order(order)
+            reminder_agent.save_orders(orders)
         
         # Step 4: Handle return/replace commands
         if command:
@@ -66,12 +67,13 @@ async def main_workflow(
         
         # Step 5: Show order summary
         typer.echo("\n📋 Order Summary:")
+        lines = []
         for order in orders:
-            status_emoji = "✅" if order.get('delivery_status') == 'Delivered' else "🚚"
-            typer.echo(f"{status_emoji} {order.get('product_name')} - {order.get('price')} - {order.get('delivery_status')}")
-            
-            if order.get('return_deadline'):
-                typer.echo(f"   ⏰ Return deadline: {order.get('return_deadline')}")
+            name, price, status, deadline = (order.get(key) for key in SUMMARY_FIELDS)
+            lines.append(f"{'✅' if status == 'Delivered' else '🚚'} {name} - {price} - {status}")
+            if deadline:
+                lines.append(f"   ⏰ Return deadline: {deadline}")
+        typer.echo("\n".join(lines))
     
     except Exception as e:
         typer.echo(f"❌ Error: {str(e)}")
@@ -100,19 +102,23 @@ def list_orders():
     """List all saved orders from database"""
     init_database()
     reminder_agent = ReminderAgent()
-    orders = reminder_agent.get_all_orders()
-    
-    if not orders:
-        typer.echo("📦 No orders found in database.")
-        return
     
-    typer.echo(f"📦 Found {len(orders)} saved orders:")
-    for order in orders:
-        typer.echo(f"  • {order['product_name']} (Order ID: {order['order_id']})")
-        typer.echo(f"    Price: {order['price']} | Status: {order['delivery_status']}")
+    # Print each order as it streams in rather than loading the whole table first
+    count = 0
+    for order in reminder_agent.iter_orders():
+        lines = [
+            f"  • {order['product_name']} (Order ID: {order['order_id']})",
+            f"    Price: {order['price']} | Status: {order['delivery_status']}"
+        ]
         if order['return_deadline']:
-            typer.echo(f"    Return deadline: {order['return_deadline']}")
-        typer.echo()
+            lines.append(f"    Return deadline: {order['return_deadline']}")
+        typer.echo("\n".join(lines) + "\n")
+        count += 1
+    
+    if count:
+        typer.echo(f"📦 Found {count} saved orders")
+    else:
+        typer.echo("📦 No orders found in database.")
 
 if __name__ == "__main__":
     app()
\ No newline at end of file
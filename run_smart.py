@@ -5,12 +5,26 @@ Uses Groq LLM to intelligently identify login elements
 """
 
 import asyncio
+import argparse
+import os
+import sys
+from typing import List, Optional
 import typer
+import patch_playwright  # noqa: F401  (must precede Playwright imports)
 from agents.smart_login_agent import SmartLoginAgent
 from agents.order_agent import OrderAgent
 from agents.return_agent import ReturnAgent
 from agents.reminder_agent import ReminderAgent
 from utils.database import init_database
+from utils.browser_pool import shared_browser_session
+from utils import daemon
+
+SUMMARY_FIELDS = ('product_name', 'price', 'delivery_status', 'return_deadline')
+
+def prepare_agents():
+    """Initialize the database and build the post-login agents"""
+    init_database()
+    return OrderAgent(), ReturnAgent(), ReminderAgent()
 
 async def smart_automation(
     phone_number: str,
@@ -22,86 +36,128 @@ async def smart_automation(
     print("🤖 Starting AI-powered automation for Ajio.com...")
     print("🧠 Using Groq LLM for intelligent element detection...")
     
-    # Initialize database
-    init_database()
-    
     # Use smart agent with AI vision
     login_agent = SmartLoginAgent(headless=headless)
-    order_agent = OrderAgent()
-    return_agent = ReturnAgent()
-    reminder_agent = ReminderAgent()
+    
+    # Initialize database and agents in a worker thread while the browser launches
+    setup_task = asyncio.create_task(asyncio.to_thread(prepare_agents))
     
     try:
-        # Start browser with stealth + AI capabilities
-        await login_agent.start_browser()
-        
-        # Login with AI assistance
-        print("🔐 Attempting smart login with AI vision...")
-        success = await login_agent.login(phone_number)
-        
-        if success:
-            print("✅ AI-powered login successful!")
-            
-            # Scrape orders
-            print("📦 Scraping orders...")
-            orders = await order_agent.scrape_orders(login_agent.page)
-            
-            if orders:
-                print(f"✅ Found {len(orders)} orders")
+        async with shared_browser_session(headless, SmartLoginAgent.BROWSER_ARGS) as (_, browser):
+            try:
+                # Start browser with stealth + AI capabilities
+                await login_agent.start_browser(browser)
+                order_agent, return_agent, reminder_agent = await setup_task
                 
-                # Save orders to database
-                for order in orders:
-                    reminder_agent.save_order(order)
+                # Login with AI assistance
+                print("🔐 Attempting smart login with AI vision...")
+                success = await login_agent.login(phone_number)
                 
-                # Show order summary
-                print("\n📋 Order Summary:")
-                for order in orders:
-                    status_emoji = "✅" if order.get('delivery_status') == 'Delivered' else "🚚"
-                    print(f"{status_emoji} {order.get('product_name')} - {order.get('price')} - {order.get('delivery_status')}")
+                if success:
+                    print("✅ AI-powered login successful!")
                     
-                    if order.get('return_deadline'):
-                        print(f"   ⏰ Return deadline: {order.get('return_deadline')}")
-            else:
-                print("ℹ️ No orders found")
-            
-            # Handle return/replace commands
-            if command:
-                print(f"🔄 Processing command: {command}")
-                await return_agent.process_command(login_agent.page, command)
-            
-            return True
-        else:
-            print("❌ AI-powered login failed")
-            return False
+                    # Scrape orders
+                    print("📦 Scraping orders...")
+                    orders = await order_agent.scrape_orders(login_agent.page)
+                    
+                    if orders:
+                        print(f"✅ Found {len(orders)} orders")
+                        
+                        # Save orders to database
+                        reminder_agent.save_orders(orders)
+                        
+                        # Show order summary
+                        print("\n📋 Order Summary:")
+                        lines = []
+                        for order in orders:
+                            name, price, status, deadline = (order.get(key) for key in SUMMARY_FIELDS)
+                            lines.append(f"{'✅' if status == 'Delivered' else '🚚'} {name} - {price} - {status}")
+                            if deadline:
+                                lines.append(f"   ⏰ Return deadline: {deadline}")
+                        print("\n".join(lines))
+                    else:
+                        print("ℹ️ No orders found")
+                    
+                    # Handle return/replace commands
+                    if command:
+                        print(f"🔄 Processing command: {command}")
+                        await return_agent.process_command(login_agent.page, command)
+                    
+                    return True
+                else:
+                    print("❌ AI-powered login failed")
+                    return False
+            finally:
+                await login_agent.close_browser()
             
     except Exception as e:
         print(f"❌ Error: {str(e)}")
         return False
     finally:
-        await login_agent.close_browser()
+        # A failed browser start skips the await above; never leave the setup task pending or its error unretrieved
+        if not setup_task.done():
+            setup_task.cancel()
+        await asyncio.gather(setup_task, return_exceptions=True)
+
+def env_flag(name: str) -> Optional[bool]:
+    """Read a yes/no environment variable, returning None when unset"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return None
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line options, falling back to AJIO_* environment variables"""
+    parser = argparse.ArgumentParser(description="Smart automation with AI vision for Ajio.com")
+    parser.add_argument("--phone", default=os.getenv("AJIO_PHONE"),
+                        help="Phone number with country code (env: AJIO_PHONE)")
+    parser.add_argument("--headless", action=argparse.BooleanOptionalAction, default=env_flag("AJIO_HEADLESS"),
+                        help="Run the browser in headless mode, or visible with --no-headless (env: AJIO_HEADLESS)")
+    parser.add_argument("--command", default=os.getenv("AJIO_COMMAND"),
+                        help="Return/replace command to run after scraping (env: AJIO_COMMAND)")
+    parser.add_argument("--check-reminders", action="store_true", help="Check return deadlines")
+    parser.add_argument("--list-orders", action="store_true", help="List saved orders")
+    parser.add_argument("--daemon", action="store_true",
+                        help=f"Keep a warm database serving --check-reminders/--list-orders on {daemon.SOCKET_PATH} (env: AJIO_SOCKET)")
+    return parser.parse_args(argv)
 
-def main():
+def main(args: Optional[argparse.Namespace] = None):
     """Main CLI interface for smart automation"""
     print("🤖 Ajio.com Smart Automation with AI Vision")
     print("=" * 60)
     print("🧠 Powered by Groq LLM for intelligent element detection")
     print()
     
-    phone = input("📱 Enter your phone number (with country code): ")
+    args = args or parse_args([])
+    interactive = sys.stdin.isatty()
     
-    print("\n🖥️ Browser Options:")
-    print("1. Visible browser (Recommended for first use)")
-    print("2. Hidden browser (Headless mode)")
+    phone = args.phone
+    if not phone:
+        if not interactive:
+            print("❌ No phone number given. Use --phone or set AJIO_PHONE.")
+            return
+        phone = input("📱 Enter your phone number (with country code): ")
     
-    choice = input("Select option (1 or 2): ").strip()
-    headless = choice == "2"
+    headless = args.headless
+    if headless is None:
+        if interactive:
+            print("\n🖥️ Browser Options:")
+            print("1. Visible browser (Recommended for first use)")
+            print("2. Hidden browser (Headless mode)")
+            
+            choice = input("Select option (1 or 2): ").strip()
+            headless = choice == "2"
+        else:
+            headless = True
     
     if headless:
         print("⚠️ Running in headless mode")
     else:
         print("👀 Running with visible browser")
     
-    command = input("\n🔄 Enter return/replace command (optional, press Enter to skip): ").strip()
+    command = args.command
+    if command is None and interactive:
+        command = input("\n🔄 Enter return/replace command (optional, press Enter to skip): ").strip()
     if not command:
         command = None
     
@@ -137,9 +193,11 @@ def main():
 def check_reminders():
     """Check for return deadline reminders"""
     print("🔔 Checking return deadlines...")
-    init_database()
-    reminder_agent = ReminderAgent()
-    reminders = reminder_agent.check_reminders()
+    reminders = daemon.request("check_reminders")
+    if reminders is None:
+        init_database()
+        reminder_agent = ReminderAgent()
+        reminders = reminder_agent.check_reminders()
     
     if reminders:
         print(f"⚠️ Found {len(reminders)} urgent reminders!")
@@ -151,36 +209,40 @@ def check_reminders():
 def list_orders():
     """List all saved orders"""
     print("📦 Listing saved orders...")
-    init_database()
-    reminder_agent = ReminderAgent()
-    orders = reminder_agent.get_all_orders()
+    orders = daemon.request("list_orders")
+    if orders is None:
+        init_database()
+        reminder_agent = ReminderAgent()
+        orders = reminder_agent.iter_orders()
+    
+    # Print each order as it streams in rather than loading the whole table first
+    count = 0
+    for order in orders:
+        lines = [
+            f"  • {order['product_name']} (ID: {order['order_id']})",
+            f"    Price: {order['price']} | Status: {order['delivery_status']}"
+        ]
+        if order['return_deadline']:
+            lines.append(f"    Return deadline: {order['return_deadline']}")
+        print("\n".join(lines) + "\n")
+        count += 1
     
-    if orders:
-        print(f"📋 Found {len(orders)} orders:")
-        for order in orders:
-            print(f"  • {order['product_name']} (ID: {order['order_id']})")
-            print(f"    Price: {order['price']} | Status: {order['delivery_status']}")
-            if order['return_deadline']:
-                print(f"    Return deadline: {order['return_deadline']}")
-            print()
+    if count:
+        print(f"📋 Found {count} orders")
     else:
         print("📦 No orders found in database")
 
 if __name__ == "__main__":
-    import sys
+    args = parse_args()
     
-    if len(sys.argv) > 1:
-        if sys.argv[1] == "--check-reminders":
-            check_reminders()
-        elif sys.argv[1] == "--list-orders":
-            list_orders()
-        elif sys.argv[1] == "--help":
-            print("🤖 Smart Automation Commands:")
-            print("  python run_smart.py                    # Run AI-powered automation")
-            print("  python run_smart.py --check-reminders  # Check return deadlines")
-            print("  python run_smart.py --list-orders      # List saved orders")
-            print("  python run_smart.py --help             # Show this help")
-        else:
-            print("❌ Unknown command. Use --help for available options.")
+    if args.daemon:
+        try:
+            asyncio.run(daemon.serve())
+        except KeyboardInterrupt:
+            print("\n⏹️ Daemon stopped")
+    elif args.check_reminders:
+        check_reminders()
+    elif args.list_orders:
+        list_orders()
     else:
-        main()
\ No newline at end of file
+        main(args)
\ No newline at end of file
@@ -5,8 +5,10 @@ Quick setup script for local AI-powered Ajio automation
 
 import os
 import sys
+import shlex
 import subprocess
 import platform
+from concurrent.futures import ThreadPoolExecutor
 
 def run_command(command, description):
     """Run a command and handle errors"""
@@ -60,13 +62,32 @@ def install_dependencies():
         "sqlalchemy>=2.0.0",
         "email-validator>=2.1.0",
         "pytest>=7.4.0",
-        "pytest-asyncio>=0.21.0"
+        "pytest-asyncio>=0.21.0",
+        "pytest-xdist>=3.6.0"
     ]
     
-    for package in packages:
-        if not run_command(f"pip install {package}", f"Installing {package.split('>=')[0]}"):
-            return False
-    return True
+    # One pip run resolves everything together; specs are quoted so the shell
+    # does not treat ">=" as a redirect
+    specs = " ".join(shlex.quote(package) for package in packages)
+    return run_command(
+        f"{shlex.quote(sys.executable)} -m pip install --no-input --disable-pip-version-check {specs}",
+        "Installing Python dependencies"
+    )
+
+def install_optional_dependencies():
+    """Install the optional accelerators; the automation falls back to pure Python without them"""
+    packages = [
+        "selectolax>=0.3.21",
+        "hyperscan>=0.7.0",
+        "orjson>=3.8.0",
+        "brotli>=1.1.0"
+    ]
+    
+    specs = " ".join(shlex.quote(package) for package in packages)
+    return run_command(
+        f"{shlex.quote(sys.executable)} -m pip install --no-input --disable-pip-version-check {specs}",
+        "Installing optional accelerators"
+    )
 
 def install_browser():
     """Install Playwright browser"""
@@ -84,12 +105,11 @@ def test_installation():
         ("python -c 'from agents.ai_vision_agent import AIVisionAgent; print(\"AI Agent: OK\")'", "Testing AI Vision Agent")
     ]
     
-    all_passed = True
-    for command, description in test_commands:
-        if not run_command(command, description):
-            all_passed = False
+    # The checks are independent subprocesses, so run them side by side
+    with ThreadPoolExecutor(max_workers=len(test_commands)) as executor:
+        results = list(executor.map(lambda check: run_command(*check), test_commands))
     
-    return all_passed
+    return all(results)
 
 def main():
     """Main setup function"""
@@ -110,6 +130,8 @@ def main():
     if not install_dependencies():
         print("❌ Failed to install some dependencies")
         sys.exit(1)
+    if not install_optional_dependencies():
+        print("⚠️ Optional accelerators not installed; continuing with the pure-Python fallbacks")
     
     # Install browser
     print("\n🌐 Installing browser for automation...")
@@ -0,0 +1,24 @@
+"""
+Shared pytest fixtures for the Ajio.com automation agent tests.
+Keeps mocked browser objects and timing shortcuts out of the individual test modules.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+
+@pytest.fixture
+def mock_page():
+    """Mock Playwright page object"""
+    page = AsyncMock()
+    page.url = "https://www.ajio.com"
+    page.title.return_value = "Ajio - Test Page"
+    page.content.return_value = "<html><body>Test Content</body></html>"
+    return page
+
+@pytest.fixture
+def fast_sleep(monkeypatch):
+    """Replace asyncio.sleep so agents' fixed waits return immediately"""
+    sleep = AsyncMock()
+    monkeypatch.setattr(asyncio, 'sleep', sleep)
+    return sleep
@@ -5,40 +5,62 @@ Uses pytest for testing browser automation functionality.
 
 import pytest
 import asyncio
+import contextvars
+import gzip
+import json
+import socket
+import threading
 from unittest.mock import Mock, AsyncMock, patch
-from datetime import datetime, timedelta
-
+from datetime import date, datetime, timedelta
+from bs4 import BeautifulSoup
+import patch_playwright
+from agents import ai_vision_agent
+from agents.ai_vision_agent import AIVisionAgent
 from agents.login_agent import LoginAgent
 from agents.order_agent import OrderAgent
-from agents.return_agent import ReturnAgent
-from agents.reminder_agent import ReminderAgent
+from agents.return_agent import ReturnAgent, score_order_text
+from agents.reminder_agent import ReminderAgent, BULK_INDEX_THRESHOLD
 from models.order import Order
-from utils.database import init_database, get_db_connection
+import run_smart
+import run_stealth
+from utils import crawl4ai_helper, daemon, database
+from utils.popup_handler import PopupHandler, _selector_entry
+from utils.database import init_database, get_db_connection, close_db_connections
+from utils.http_compression import COMPRESS_MIN_SIZE
 from config import TestConfig
 
+# Fixture timestamps are computed once per run; no test depends on sub-second differences
+_TODAY = date.today()
+_SCRAPED_AT = datetime.now().isoformat()
+
 # Test configuration
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_config():
     return TestConfig()
 
 @pytest.fixture
-def test_database():
-    """Set up test database"""
+def test_database(tmp_path, monkeypatch):
+    """Set up a fresh test database per test, so xdist workers never share a file"""
+    db_path = str(tmp_path / TestConfig.DATABASE_PATH)
+    monkeypatch.setattr(database, 'DATABASE_PATH', db_path)
+    monkeypatch.setattr(TestConfig, 'DATABASE_PATH', db_path)
     init_database()
-    yield
-    # Cleanup after tests
-    import os
-    if os.path.exists(TestConfig.DATABASE_PATH):
-        os.remove(TestConfig.DATABASE_PATH)
+    yield db_path
+    close_db_connections()
 
 @pytest.fixture
-def mock_page():
-    """Mock Playwright page object"""
-    page = AsyncMock()
-    page.url = "https://www.ajio.com"
-    page.title.return_value = "Ajio - Test Page"
-    page.content.return_value = "<html><body>Test Content</body></html>"
-    return page
+def web_client(test_database):
+    """Flask test client for the dashboard app, backed by the per-test database"""
+    # Imported here so the app's import-time init_database() runs against the test database
+    import web_interface
+    return web_interface.app.test_client()
+
+@pytest.fixture
+def login_agent_with_mock_page(mock_page):
+    """LoginAgent already attached to a mock page"""
+    login_agent = LoginAgent()
+    login_agent.page = mock_page
+    return login_agent
 
 @pytest.fixture
 def sample_order_data():
@@ -51,8 +73,8 @@ def sample_order_data():
         'delivery_status': 'Delivered',
         'has_return_option': True,
         'has_replace_option': False,
-        'return_deadline': (datetime.now() + timedelta(days=5)).strftime('%Y-%m-%d'),
-        'scraped_at': datetime.now().isoformat()
+        'return_deadline': (_TODAY + timedelta(days=5)).isoformat(),
+        'scraped_at': _SCRAPED_AT
     }
 
 class TestLoginAgent:
@@ -65,12 +87,13 @@ class TestLoginAgent:
         
         with patch('agents.login_agent.async_playwright') as mock_playwright:
             mock_pw = AsyncMock()
-            mock_playwright.return_value.start.return_value = mock_pw
+            mock_playwright.return_value.start = AsyncMock(return_value=mock_pw)
             
             mock_browser = AsyncMock()
             mock_pw.chromium.launch.return_value = mock_browser
             
             mock_page = AsyncMock()
+            mock_page.context.set_default_timeout = Mock()
             mock_browser.new_page.return_value = mock_page
             
             await login_agent.start_browser()
@@ -78,12 +101,34 @@ class TestLoginAgent:
             assert login_agent.browser == mock_browser
             assert login_agent.page == mock_page
             mock_pw.chromium.launch.assert_called_once()
+            mock_page.context.grant_permissions.assert_called_once_with([])
+            assert login_agent.popup_handler.context_policies_installed
     
     @pytest.mark.asyncio
-    async def test_navigate_to_ajio(self, mock_page):
+    async def test_start_browser_shared(self):
+        """Test reusing an already launched browser"""
+        login_agent = LoginAgent(headless=True)
+        
+        mock_browser = AsyncMock()
+        mock_page = AsyncMock()
+        mock_page.context.set_default_timeout = Mock()
+        mock_browser.new_page.return_value = mock_page
+        
+        with patch('agents.login_agent.async_playwright') as mock_playwright:
+            await login_agent.start_browser(mock_browser)
+            mock_playwright.assert_not_called()
+        
+        assert login_agent.page == mock_page
+        
+        await login_agent.close_browser()
+        
+        mock_page.close.assert_called_once()
+        mock_browser.close.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_navigate_to_ajio(self, login_agent_with_mock_page, mock_page):
         """Test navigation to Ajio homepage"""
-        login_agent = LoginAgent()
-        login_agent.page = mock_page
+        login_agent = login_agent_with_mock_page
         
         with patch.object(login_agent.popup_handler, 'dismiss_popups', new_callable=AsyncMock):
             await login_agent.navigate_to_ajio()
@@ -94,10 +139,9 @@ class TestLoginAgent:
             )
     
     @pytest.mark.asyncio
-    async def test_click_login_button_success(self, mock_page):
+    async def test_click_login_button_success(self, login_agent_with_mock_page, mock_page):
         """Test successful login button click"""
-        login_agent = LoginAgent()
-        login_agent.page = mock_page
+        login_agent = login_agent_with_mock_page
         
         # Mock successful selector find
         mock_page.wait_for_selector.return_value = True
@@ -109,10 +153,9 @@ class TestLoginAgent:
         mock_page.click.assert_called()
     
     @pytest.mark.asyncio
-    async def test_enter_phone_number(self, mock_page):
+    async def test_enter_phone_number(self, login_agent_with_mock_page, mock_page):
         """Test phone number entry"""
-        login_agent = LoginAgent()
-        login_agent.page = mock_page
+        login_agent = login_agent_with_mock_page
         
         # Mock successful input field find
         mock_page.wait_for_selector.return_value = True
@@ -127,7 +170,7 @@ class TestOrderAgent:
     """Test cases for OrderAgent"""
     
     @pytest.mark.asyncio
-    async def test_navigate_to_orders(self, mock_page):
+    async def test_navigate_to_orders(self, mock_page, fast_sleep):
         """Test navigation to orders page"""
         order_agent = OrderAgent()
         
@@ -139,6 +182,23 @@ class TestOrderAgent:
         
         assert result is True
         mock_page.click.assert_called()
+        fast_sleep.assert_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_scrape_orders_keeps_page_timeouts(self, mock_page, fast_sleep):
+        """Test scraping bounds its own navigation without changing the caller's page defaults"""
+        order_agent = OrderAgent()
+        mock_page.set_default_navigation_timeout = Mock()
+        mock_page.wait_for_selector.side_effect = TimeoutError("menu not found")
+        
+        await order_agent.scrape_orders(mock_page)
+        
+        mock_page.set_default_navigation_timeout.assert_not_called()
+        mock_page.goto.assert_called_once_with(
+            'https://www.ajio.com/my-account/orders',
+            wait_until='networkidle',
+            timeout=TestConfig.NAVIGATION_TIMEOUT
+        )
     
     @pytest.mark.asyncio
     async def test_extract_single_order(self, mock_page, sample_order_data):
@@ -155,6 +215,19 @@ class TestOrderAgent:
         assert 'product_name' in result
         assert 'order_id' in result
     
+    @pytest.mark.asyncio
+    async def test_extract_order_cards_keeps_order(self, mock_page):
+        """Test concurrent card extraction preserves page order"""
+        order_agent = OrderAgent()
+        mock_page.query_selector_all.return_value = [
+            TestUtils.create_mock_order_element(f"Product {i}", f"ORD{i}", "₹999")
+            for i in range(5)
+        ]
+        
+        orders = await order_agent.extract_order_cards(mock_page)
+        
+        assert [order['order_id'] for order in orders] == [f"ORD{i}" for i in range(5)]
+    
     def _mock_query_selector(self, selector):
         """Helper to mock query_selector results"""
         mock_element = AsyncMock()
@@ -202,9 +275,7 @@ class TestReturnAgent:
         # Mock order element
         mock_element = AsyncMock()
         mock_element.inner_text.return_value = "Red Nike Shoes - ₹2,999 - Delivered"
-        mock_element.query_selector_all.return_value = [
-            self._create_mock_button("Return Item")
-        ]
+        mock_element.eval_on_selector_all.return_value = ["Return Item"]
         
         intent = {
             'action': 'return',
@@ -217,11 +288,18 @@ class TestReturnAgent:
         
         assert score > 0  # Should have positive score for matching order
     
-    def _create_mock_button(self, text):
-        """Helper to create mock button element"""
-        button = AsyncMock()
-        button.inner_text.return_value = text
-        return button
+    def test_score_order_text(self):
+        """Test intent term weighting against order text"""
+        intent = {
+            'action': 'return',
+            'colors': ['red'],
+            'products': ['shoes'],
+            'keywords': ['return', 'my', 'red', 'shoes']
+        }
+        
+        # red (2.0) + shoes (3.0) + keyword 'shoes' (0.5); short keywords are ignored
+        assert score_order_text("red nike shoes - delivered", intent) == 5.5
+        assert score_order_text("blue denim jacket", intent) == 0.0
 
 class TestReminderAgent:
     """Test cases for ReminderAgent"""
@@ -239,6 +317,59 @@ class TestReminderAgent:
         assert len(orders) == 1
         assert orders[0]['order_id'] == sample_order_data['order_id']
     
+    def test_save_orders(self, test_database):
+        """Test saving a batch of orders written in several chunks"""
+        reminder_agent = ReminderAgent()
+        orders = [TestUtils.create_test_order(f"BULK{i}") for i in range(3)]
+        
+        result = reminder_agent.save_orders(iter(orders), chunk_size=2)
+        
+        assert result is True
+        saved_ids = {order['order_id'] for order in reminder_agent.get_all_orders()}
+        assert {'BULK0', 'BULK1', 'BULK2'} <= saved_ids
+    
+    def test_save_orders_bulk_keeps_indexes(self, test_database):
+        """Test a bulk import rebuilds the secondary indexes inside its transaction"""
+        reminder_agent = ReminderAgent()
+        orders = [TestUtils.create_test_order(f"BULK{i}") for i in range(BULK_INDEX_THRESHOLD + 5)]
+        
+        assert reminder_agent.save_orders(iter(orders), chunk_size=40) is True
+        
+        assert reminder_agent.count_orders() == len(orders)
+        with get_db_connection() as conn:
+            indexes = {row['name'] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert set(database.ORDER_INDEXES) <= indexes
+    
+    def test_save_orders_bulk_failure_rolls_back(self, test_database):
+        """Test a failed bulk import leaves no rows and the indexes in place"""
+        reminder_agent = ReminderAgent()
+        
+        def orders():
+            for i in range(BULK_INDEX_THRESHOLD + 5):
+                yield TestUtils.create_test_order(f"BULK{i}")
+            raise RuntimeError("source failed")
+        
+        assert reminder_agent.save_orders(orders(), chunk_size=40) is False
+        
+        assert reminder_agent.count_orders() == 0
+        with get_db_connection() as conn:
+            indexes = {row['name'] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert set(database.ORDER_INDEXES) <= indexes
+    
+    def test_save_orders_updates_in_place(self, test_database):
+        """Test re-saving an order updates its existing row"""
+        reminder_agent = ReminderAgent()
+        order = TestUtils.create_test_order("UPSERT1")
+        reminder_agent.save_orders([order])
+        first = reminder_agent.get_all_orders()[0]
+        
+        reminder_agent.save_orders([{**order, 'delivery_status': 'Returned'}])
+        
+        orders = reminder_agent.get_all_orders()
+        assert len(orders) == 1
+        assert orders[0]['id'] == first['id']
+        assert orders[0]['delivery_status'] == 'Returned'
+    
     def test_check_reminders_urgent(self, test_database):
         """Test checking for urgent reminders"""
         reminder_agent = ReminderAgent()
@@ -260,6 +391,35 @@ class TestReminderAgent:
         assert len(urgent_orders) == 1
         assert urgent_orders[0]['order_id'] == 'URGENT123'
     
+    def test_get_orders_due_by_cutoff_boundary(self, test_database):
+        """Test deadlines on the cutoff are included and the day after is not"""
+        reminder_agent = ReminderAgent()
+        reminder_agent.save_orders([
+            {'order_id': 'DUE', 'product_name': 'On cutoff', 'return_deadline': '2025-08-05'},
+            {'order_id': 'EARLY', 'product_name': 'Before cutoff', 'return_deadline': '2025-08-04'},
+            {'order_id': 'LATE', 'product_name': 'After cutoff', 'return_deadline': '2025-08-06'},
+            {'order_id': 'NONE', 'product_name': 'No deadline', 'return_deadline': None}
+        ])
+        
+        due = reminder_agent.get_orders_due_by('2025-08-05')
+        
+        assert [order['order_id'] for order in due] == ['EARLY', 'DUE']
+    
+    def test_get_orders_due_by_unpadded_deadlines(self, test_database):
+        """Test deadlines saved without zero padding are stored as ISO dates and still compare by date"""
+        reminder_agent = ReminderAgent()
+        reminder_agent.save_order({'order_id': 'ONE', 'product_name': 'Single', 'return_deadline': '2025-8-5'})
+        reminder_agent.save_orders([
+            {'order_id': 'BULK', 'product_name': 'Bulk', 'return_deadline': '2025-8-10'},
+            {'order_id': 'LATER', 'product_name': 'Later', 'return_deadline': '2025-10-1'}
+        ])
+        
+        due = reminder_agent.get_orders_due_by('2025-08-10')
+        
+        assert [(order['order_id'], order['return_deadline']) for order in due] == [
+            ('ONE', '2025-08-05'), ('BULK', '2025-08-10')
+        ]
+    
     def test_get_statistics(self, test_database, sample_order_data):
         """Test getting order statistics"""
         reminder_agent = ReminderAgent()
@@ -270,6 +430,26 @@ class TestReminderAgent:
         assert stats['total_orders'] == 1
         assert stats['returnable_orders'] == 1
         assert 'Delivered' in stats['status_counts']
+    
+    def test_count_orders(self, test_database, sample_order_data):
+        """Test counting orders"""
+        reminder_agent = ReminderAgent()
+        assert reminder_agent.count_orders() == 0
+        
+        reminder_agent.save_order(sample_order_data)
+        
+        assert reminder_agent.count_orders() == 1
+    
+    def test_get_orders_version(self, test_database, sample_order_data):
+        """Test the orders version changes on every write"""
+        reminder_agent = ReminderAgent()
+        empty = reminder_agent.get_orders_version()
+        
+        reminder_agent.save_order(sample_order_data)
+        saved = reminder_agent.get_orders_version()
+        reminder_agent.delete_order(sample_order_data['order_id'])
+        
+        assert len({empty, saved, reminder_agent.get_orders_version()}) == 3
 
 class TestOrderModel:
     """Test cases for Order model"""
@@ -305,6 +485,19 @@ class TestOrderModel:
         order.return_deadline = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
         assert order.is_returnable() is False
     
+    def test_is_replaceable(self, sample_order_data):
+        """Test replacement eligibility check"""
+        order = Order.from_dict(sample_order_data)
+        
+        assert order.is_replaceable() is False
+        
+        order.has_replace_option = True
+        assert order.is_replaceable() is True
+        
+        # Malformed deadlines are never eligible
+        order.return_deadline = 'not-a-date'
+        assert order.is_replaceable() is False
+    
     def test_days_until_deadline(self, sample_order_data):
         """Test deadline calculation"""
         order = Order.from_dict(sample_order_data)
@@ -380,6 +573,509 @@ def pytest_configure(config):
     )
 
 # Test utilities
+class TestCrawlHelper:
+    """Test cases for the scraping helpers"""
+    
+    def test_text_matches_across_parsers(self, monkeypatch):
+        """Test selectolax and BeautifulSoup trees give the same page text, without script or style bodies"""
+        html = (
+            '<html><head><title>T</title><style>a{}</style></head><body><i>i</i>'
+            '<script>var x=1;</script><noscript>NS</noscript>'
+            '<p>Hello</p> <b>world</b>x</body></html>'
+        )
+        
+        crawl4ai_helper._parse_html.cache_clear()
+        default_text = crawl4ai_helper._text(crawl4ai_helper._parse_html(html))
+        
+        monkeypatch.setattr(crawl4ai_helper, 'SELECTOLAX_AVAILABLE', False)
+        crawl4ai_helper._parse_html.cache_clear()
+        soup_text = crawl4ai_helper._text(crawl4ai_helper._parse_html(html))
+        crawl4ai_helper._parse_html.cache_clear()
+        
+        assert default_text == soup_text == 'TiNSHelloworldx'
+    
+    @pytest.mark.parametrize("selectolax", [True, False])
+    @pytest.mark.parametrize("html", [
+        '<body><noscript><a href="/n" title="N">no js</a></noscript><a href="/a">A<script>x</script></a>'
+        '<form action="/f"><input name="q" required><select name="s"></select></form></body>',
+        '<body><template><a href="/t">T</a><form method="POST"><textarea name="t"></textarea></form></template>'
+        '<noscript><form action="/n"><input type="hidden" name="h"></form></noscript><a href="/a">A</a></body>',
+    ])
+    def test_links_and_forms_match_beautifulsoup(self, monkeypatch, html, selectolax):
+        """Test links and forms, including those in noscript and template, match a plain BeautifulSoup walk"""
+        soup = BeautifulSoup(html, 'html.parser')
+        expected_links = [
+            {'url': link['href'], 'text': link.get_text(strip=True), 'title': link.get('title', '')}
+            for link in soup.find_all('a', href=True)
+        ]
+        expected_forms = [
+            {
+                'action': form.get('action', ''),
+                'method': form.get('method', 'GET'),
+                'inputs': [
+                    {
+                        'type': field.get('type', ''),
+                        'name': field.get('name', ''),
+                        'placeholder': field.get('placeholder', ''),
+                        'required': field.has_attr('required')
+                    }
+                    for field in form.find_all(['input', 'select', 'textarea'])
+                ]
+            }
+            for form in soup.find_all('form')
+        ]
+        
+        monkeypatch.setattr(crawl4ai_helper, 'SELECTOLAX_AVAILABLE', selectolax and crawl4ai_helper.SELECTOLAX_AVAILABLE)
+        crawl4ai_helper._parse_html.cache_clear()
+        tree = crawl4ai_helper._parse_html(html)
+        helper = crawl4ai_helper.CrawlHelper()
+        crawl4ai_helper._parse_html.cache_clear()
+        
+        assert helper.extract_links(tree) == expected_links
+        assert helper.extract_forms(tree) == expected_forms
+    
+    @pytest.mark.parametrize("text", [' #ıKR5dk', ' #İKR5dk', 'Order ID: FN123456'])
+    def test_order_id_prefilter_matches_plain_regex(self, text):
+        """Test the hyperscan prefilter never hides a match the regexes find, including Unicode case folds"""
+        matches = (pattern.search(text) for pattern in crawl4ai_helper._ORDER_ID_PATTERNS)
+        expected = next(match.group(1) for match in matches if match)
+        
+        assert crawl4ai_helper.CrawlHelper().extract_order_id_from_text(text) == expected
+    
+    @pytest.mark.asyncio
+    async def test_scrape_urls_bounded_and_ordered(self):
+        """Test scrape_urls caps requests in flight, keeps input order and reports failed URLs in place"""
+        in_flight = 0
+        peak = 0
+        
+        class FakeResponse:
+            def __init__(self, url):
+                self.status = 404 if url.endswith('/missing') else 200
+                self.body = f'<html><body><h1>{url}</h1></body></html>'.encode()
+            
+            async def read(self):
+                return self.body
+            
+            def get_encoding(self):
+                return 'utf-8'
+        
+        class FakeRequest:
+            def __init__(self, url):
+                self.url = url
+            
+            async def __aenter__(self):
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                # Earlier URLs finish later, so gather has to restore the order
+                await asyncio.sleep(0.001 * (10 - int(self.url.rsplit('/', 2)[-2])))
+                if self.url.endswith('/boom'):
+                    in_flight -= 1
+                    raise ConnectionError('connection reset')
+                return FakeResponse(self.url)
+            
+            async def __aexit__(self, *exc_info):
+                nonlocal in_flight
+                in_flight -= 1
+        
+        helper = crawl4ai_helper.CrawlHelper()
+        helper.session = Mock()
+        helper.session.get = Mock(side_effect=lambda url, headers=None: FakeRequest(url))
+        urls = [f'https://example.com/{i}/ok' for i in range(8)]
+        urls[2] = 'https://example.com/2/boom'
+        urls[5] = 'https://example.com/5/missing'
+        
+        results = await helper.scrape_urls(urls, concurrency=3)
+        
+        assert peak == 3
+        assert [result['url'] for result in results] == urls
+        assert results[2] == {'url': urls[2], 'error': 'connection reset'}
+        assert results[5] == {'url': urls[5], 'status': 404, 'error': 'HTTP 404'}
+        assert all(results[i]['product_info']['name'] == urls[i] for i in (0, 1, 3, 4, 6, 7))
+
+class TestPopupHandler:
+    """Test cases for popup detection and dismissal"""
+    
+    @pytest.mark.parametrize("selector, expected", [
+        ('button:has-text("Accept All")', ('button', 'accept all')),
+        ('[role="button"]:has-text("×")', ('[role="button"]', '×')),
+        (':has-text("Skip")', ('*', 'skip')),
+        ('.popup-close', ('.popup-close', None)),
+    ])
+    def test_selector_entry(self, selector, expected):
+        """Test selectors split into their CSS part and lowercased :has-text() filter"""
+        assert _selector_entry(selector) == expected
+    
+    @pytest.mark.asyncio
+    async def test_find_visible_popup_maps_index(self, mock_page):
+        """Test the index found in the page maps back to its strategy and selector"""
+        handler = PopupHandler()
+        strategies = handler.popup_strategies
+        mock_page.evaluate.return_value = len(strategies[0]['selectors']) + 1
+        
+        assert await handler.find_visible_popup(mock_page, strategies) == (strategies[1], strategies[1]['selectors'][1])
+        
+        mock_page.evaluate.return_value = -1
+        assert await handler.find_visible_popup(mock_page, strategies) is None
+    
+    @pytest.mark.asyncio
+    async def test_dismiss_round_once_per_strategy(self, mock_page):
+        """Test a round dismisses at most one popup per strategy, in strategy order"""
+        handler = PopupHandler()
+        strategies = handler.popup_strategies
+        mock_page.evaluate.side_effect = [0, 0, -1]
+        
+        with patch.object(handler, 'click_popup_control', AsyncMock(return_value=True)):
+            dismissed = await handler.dismiss_round(mock_page, strategies)
+        
+        assert dismissed == [strategies[0]['name'], strategies[1]['name']]
+        # Each lookup only offers the strategies not yet dismissed
+        offered = [len(call.args[1]) for call in mock_page.evaluate.call_args_list]
+        assert offered == [sum(len(strategy['selectors']) for strategy in strategies[skip:]) for skip in range(3)]
+    
+    @pytest.mark.asyncio
+    async def test_popup_queue_dropped_on_close(self, mock_page):
+        """Test a page's popup queue is released once the page closes"""
+        handler = PopupHandler()
+        mock_page.on = Mock()
+        mock_page.once = Mock()
+        mock_page.remove_listener = Mock()
+        
+        await handler.dismiss_all_popups_continuously(mock_page, duration=0)
+        assert mock_page in handler._popup_queues
+        
+        event, on_close = mock_page.once.call_args.args
+        on_close(mock_page)
+        
+        assert event == 'close'
+        assert mock_page not in handler._popup_queues
+
+class TestPlaywrightPatch:
+    """Test cases for the optional Playwright stack capture patch"""
+    
+    @pytest.mark.asyncio
+    async def test_errors_keep_api_name(self, monkeypatch):
+        """Test errors raised through the patched stack capture are still prefixed with the API name"""
+        from playwright._impl import _connection
+        from playwright.async_api import Page
+        monkeypatch.setattr(_connection, '_capture_stack_trace', patch_playwright._frame_stack_trace)
+        connection = Mock(_api_zone=contextvars.ContextVar('api_zone', default=None), _loop=asyncio.get_running_loop())
+        
+        async def timeout():
+            raise TimeoutError("Timeout 30000ms exceeded.")
+        
+        class PageImpl:
+            async def goto(self, **kwargs):
+                return await _connection.Connection.wrap_api_call(connection, timeout)
+        
+        page = Page.__new__(Page)
+        page._impl_obj = PageImpl()
+        
+        with pytest.raises(TimeoutError, match=r"^Page\.goto: Timeout 30000ms exceeded\.$"):
+            await page.goto('https://www.ajio.com')
+    
+    def test_patch_covers_by_name_imports(self, monkeypatch):
+        """Test every module holding its own reference to the stack capture gets the patched one"""
+        import importlib
+        modules = [importlib.import_module(f'playwright._impl.{name}') for name in patch_playwright._STACK_TRACE_MODULES]
+        for module in modules:
+            monkeypatch.setattr(module, '_capture_stack_trace', module._capture_stack_trace)
+        monkeypatch.setenv('PW_INSPECT_STACK', '0')
+        
+        assert patch_playwright.apply_patch() is True
+        assert all(module._capture_stack_trace is patch_playwright._frame_stack_trace for module in modules)
+
+class TestDaemon:
+    """Test cases for the JSON-lines daemon and its client"""
+    
+    @staticmethod
+    async def start_daemon(socket_path):
+        """Run daemon.serve() as a task and wait until its socket accepts commands"""
+        task = asyncio.create_task(daemon.serve(socket_path))
+        while await asyncio.to_thread(daemon.request, 'ping', socket_path) != 'pong':
+            assert not task.done()
+            await asyncio.sleep(0.01)
+        return task
+    
+    @pytest.mark.asyncio
+    async def test_commands_round_trip(self, test_database, tmp_path, capsys):
+        """Test ping, a real command, an unknown command and a malformed line over the socket"""
+        socket_path = str(tmp_path / 'ajio.sock')
+        task = await self.start_daemon(socket_path)
+        try:
+            ReminderAgent().save_orders([TestUtils.create_test_order("DAEMON1")])
+            
+            orders = await asyncio.to_thread(daemon.request, 'list_orders', socket_path)
+            assert [order['order_id'] for order in orders] == ['DAEMON1']
+            
+            assert await asyncio.to_thread(daemon.request, 'shutdown', socket_path) is None
+            assert 'Unknown command: shutdown' in capsys.readouterr().out
+            
+            reader, writer = await asyncio.open_unix_connection(socket_path)
+            writer.write(b'not json\n')
+            response = json.loads(await reader.readline())
+            writer.close()
+            assert response['ok'] is False and response['error']
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        
+        assert not (tmp_path / 'ajio.sock').exists()
+    
+    def test_request_without_daemon(self, tmp_path):
+        """Test the client reports no daemon when the socket is missing, so callers fall back"""
+        assert daemon.request('ping', str(tmp_path / 'missing.sock')) is None
+    
+    @pytest.mark.asyncio
+    async def test_serve_keeps_live_daemon_socket(self, test_database, tmp_path):
+        """Test serve() leaves a socket alone while another daemon still answers on it"""
+        socket_path = str(tmp_path / 'ajio.sock')
+        
+        async def answer_ping(reader, writer):
+            await reader.readline()
+            writer.write(b'{"ok": true, "result": "pong"}\n')
+            await writer.drain()
+            writer.close()
+        
+        server = await asyncio.start_unix_server(answer_ping, path=socket_path)
+        async with server:
+            await asyncio.wait_for(daemon.serve(socket_path), timeout=5)
+            
+            assert await asyncio.to_thread(daemon.request, 'ping', socket_path) == 'pong'
+    
+    @pytest.mark.asyncio
+    async def test_serve_replaces_stale_socket(self, test_database, tmp_path):
+        """Test serve() takes over a socket file nothing is listening on"""
+        socket_path = str(tmp_path / 'ajio.sock')
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(socket_path)
+        stale.close()
+        
+        task = await self.start_daemon(socket_path)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+class TestAIVisionAgent:
+    """Test cases for the Groq-backed login analysis"""
+    
+    @pytest.fixture
+    def vision_agent(self, monkeypatch):
+        """AIVisionAgent with a mocked Groq client"""
+        monkeypatch.setenv('GROQ_API_KEY', 'test-key')
+        agent = AIVisionAgent()
+        agent.groq_client = Mock()
+        return agent
+    
+    @staticmethod
+    def completion(content):
+        """Mock chat completion whose first choice carries content"""
+        return Mock(choices=[Mock(message=Mock(content=content))])
+    
+    @staticmethod
+    def page_data(**overrides):
+        """Extracted page data as _extract_page_data returns it"""
+        return {
+            'title': 'AJIO',
+            'url': 'https://www.ajio.com/?utm_source=test',
+            'interactive_elements': [{
+                'tag': 'button', 'text': 'Sign In', 'id': 'login', 'name': '', 'className': 'btn',
+                'href': '', 'type': 'submit', 'x': 10, 'y': 20, 'width': 80, 'height': 30
+            }],
+            'form_elements': [{'index': 0, 'action': '', 'method': 'get', 'inputs': [
+                {'tag': 'input', 'type': 'tel', 'name': 'mobile', 'placeholder': 'Mobile', 'id': ''}
+            ]}],
+            'header_content': 'Hi there',
+            **overrides
+        }
+    
+    def test_cache_key_ignores_volatile_page_details(self, vision_agent):
+        """Test positions, query strings and header text leave the cache key unchanged, structure does not"""
+        key = vision_agent._cache_key(self.page_data())
+        moved = self.page_data()
+        moved['interactive_elements'][0].update(x=400, y=5, text='Sign in now')
+        
+        assert vision_agent._cache_key(moved) == key
+        assert vision_agent._cache_key(self.page_data(url='https://www.ajio.com/?utm_source=other', header_content='Sale!')) == key
+        
+        renamed = self.page_data()
+        renamed['form_elements'][0]['inputs'][0]['name'] = 'phone'
+        assert vision_agent._cache_key(renamed) != key
+        assert vision_agent._cache_key(self.page_data(url='https://www.ajio.com/login')) != key
+    
+    def test_analysis_cache_hit_miss_and_ttl(self, vision_agent, test_database, monkeypatch):
+        """Test analyses are cached until the TTL passes and failed analyses are never cached"""
+        key = vision_agent._cache_key(self.page_data())
+        analysis = {'login_found': True, 'login_element': {'recommended_selector': '#login'}}
+        
+        assert vision_agent._get_cached_analysis(key) is None
+        vision_agent._store_analysis(key, analysis)
+        assert vision_agent._get_cached_analysis(key) == analysis
+        
+        expired = ai_vision_agent.time.time() + TestConfig.AI_CACHE_TTL_DAYS * 86400 + 60
+        monkeypatch.setattr(ai_vision_agent.time, 'time', lambda: expired)
+        assert vision_agent._get_cached_analysis(key) is None
+        
+        other_key = vision_agent._cache_key(self.page_data(url='https://www.ajio.com/login'))
+        vision_agent._store_analysis(other_key, {'error': 'rate limited'})
+        assert vision_agent._get_cached_analysis(other_key) is None
+    
+    @pytest.mark.asyncio
+    async def test_submit_batch_orders_replies_and_retries_missing(self, vision_agent, fast_sleep):
+        """Test batch replies come back in prompt order and unanswered prompts are retried synchronously"""
+        client = vision_agent.groq_client
+        client.files.create.return_value = Mock(id='file-in')
+        client.batches.create.return_value = Mock(id='batch-1', status='in_progress')
+        client.batches.retrieve.return_value = Mock(id='batch-1', status='completed', output_file_id='file-out')
+        output = [
+            {'custom_id': f'prompt-{i}', 'response': {'body': {'choices': [{'message': {'content': f' reply {i} '}}]}}}
+            for i in (2, 0)
+        ]
+        client.files.content.return_value.text.return_value = '\n'.join(json.dumps(record) for record in output)
+        client.chat.completions.create.return_value = self.completion('retried 1')
+        
+        replies = await vision_agent.submit_batch(['p0', 'p1', 'p2'])
+        
+        assert replies == ['reply 0', 'retried 1', 'reply 2']
+        retried = client.chat.completions.create.call_args.kwargs['messages'][-1]['content']
+        assert client.chat.completions.create.call_count == 1 and retried == 'p1'
+        fast_sleep.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_submit_batch_gives_up_after_max_wait(self, vision_agent, fast_sleep, monkeypatch):
+        """Test a batch still running at the deadline is cancelled and every prompt answered synchronously"""
+        monkeypatch.setattr(ai_vision_agent, 'BATCH_MAX_WAIT', 0)
+        client = vision_agent.groq_client
+        client.batches.create.return_value = Mock(id='batch-1', status='in_progress')
+        client.chat.completions.create.side_effect = [self.completion('a'), self.completion('b')]
+        
+        replies = await vision_agent.submit_batch(['p0', 'p1'])
+        
+        assert replies == ['a', 'b']
+        client.batches.cancel.assert_called_once_with('batch-1')
+        client.batches.retrieve.assert_not_called()
+
+class TestWebInterface:
+    """Test cases for the dashboard API responses"""
+    
+    def test_orders_etag_answers_304(self, web_client):
+        """Test /api/orders sends a weak ETag and answers 304 while the orders are unchanged"""
+        ReminderAgent().save_orders([TestUtils.create_test_order("WEB1")])
+        
+        response = web_client.get('/api/orders')
+        etag = response.headers['ETag']
+        
+        assert response.status_code == 200
+        assert etag.startswith('W/')
+        assert response.get_json()['count'] == 1
+        assert web_client.get('/api/orders', headers={'If-None-Match': etag}).status_code == 304
+        
+        ReminderAgent().save_orders([TestUtils.create_test_order("WEB2")])
+        assert web_client.get('/api/orders', headers={'If-None-Match': etag}).status_code == 200
+    
+    def test_config_etag_answers_304(self, web_client):
+        """Test /api/config sends a strong ETag and answers 304 for it"""
+        response = web_client.get('/api/config')
+        etag = response.headers['ETag']
+        
+        assert response.status_code == 200
+        assert not etag.startswith('W/')
+        assert web_client.get('/api/config', headers={'If-None-Match': etag}).status_code == 304
+    
+    def test_orders_ndjson_lines(self, web_client):
+        """Test the NDJSON stream sends one {"result": order} line per saved order"""
+        ReminderAgent().save_orders([TestUtils.create_test_order(f"NDJSON{i}") for i in range(2)])
+        
+        response = web_client.get('/api/orders.ndjson')
+        lines = response.get_data(as_text=True).splitlines()
+        
+        assert response.mimetype == 'application/x-ndjson'
+        assert sorted(json.loads(line)['result']['order_id'] for line in lines) == ['NDJSON0', 'NDJSON1']
+    
+    def test_events_start_with_status_snapshot(self, web_client):
+        """Test the event stream opens with the current automation status"""
+        snapshot = web_client.get('/api/automation/status').get_data(as_text=True)
+        
+        response = web_client.get('/api/automation/events', buffered=False)
+        try:
+            first_event = next(response.response)
+        finally:
+            response.close()
+        
+        assert response.mimetype == 'text/event-stream'
+        assert first_event == f'data: {snapshot}\n\n'.encode()
+    
+    def test_start_publishes_outside_status_lock(self, web_client, monkeypatch):
+        """Test starting a run publishes its status only after the status condition is released"""
+        import web_interface
+        monkeypatch.setattr(web_interface, 'automation_status', dict(web_interface.automation_status))
+        monkeypatch.setattr(web_interface, '_status_payload', web_interface._status_payload)
+        monkeypatch.setattr(web_interface, '_status_version', web_interface._status_version)
+        monkeypatch.setattr(web_interface, 'demo_automation_workflow', Mock())
+        monkeypatch.setattr(web_interface.asyncio, 'run_coroutine_threadsafe', Mock())
+        monkeypatch.setattr(web_interface, 'get_automation_loop', Mock())
+        
+        lock_free = []
+        
+        def publish_status(payload, version):
+            # Another thread can only take the condition if no caller up the stack still holds it
+            def probe():
+                acquired = web_interface._status_changed.acquire(timeout=1)
+                if acquired:
+                    web_interface._status_changed.release()
+                lock_free.append(acquired)
+            thread = threading.Thread(target=probe)
+            thread.start()
+            thread.join()
+        
+        monkeypatch.setattr(web_interface, 'publish_status', publish_status)
+        
+        response = web_client.post('/api/automation/start', json={'phone_number': '+911234567890', 'demo_mode': True})
+        
+        assert response.status_code == 200
+        assert lock_free == [True]
+    
+    def test_gzip_only_above_min_size(self, web_client):
+        """Test large bodies are gzipped for clients that accept it and small ones are sent as-is"""
+        plain = web_client.get('/').get_data()
+        response = web_client.get('/', headers={'Accept-Encoding': 'gzip'})
+        
+        assert len(plain) >= COMPRESS_MIN_SIZE
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.get_data()) == plain
+        
+        small = web_client.get('/api/config', headers={'Accept-Encoding': 'gzip'})
+        assert len(small.get_data()) < COMPRESS_MIN_SIZE
+        assert 'Content-Encoding' not in small.headers
+
+@pytest.mark.parametrize("runner, automation", [
+    (run_smart, "smart_automation"),
+    (run_stealth, "stealth_automation"),
+])
+class TestRunners:
+    """Test cases shared by the smart and stealth command line runners"""
+    
+    def test_no_headless_overrides_env(self, monkeypatch, runner, automation):
+        """Test --no-headless wins over AJIO_HEADLESS=1 and the env still sets the default"""
+        monkeypatch.setenv("AJIO_HEADLESS", "1")
+        
+        assert runner.parse_args([]).headless is True
+        assert runner.parse_args(["--no-headless"]).headless is False
+        monkeypatch.delenv("AJIO_HEADLESS")
+        assert runner.parse_args([]).headless is None
+    
+    def test_command_prompt_with_phone_given(self, monkeypatch, runner, automation):
+        """Test an interactive run still asks for a command when --phone is passed"""
+        monkeypatch.delenv("AJIO_COMMAND", raising=False)
+        monkeypatch.setattr(runner.sys, "stdin", Mock(isatty=Mock(return_value=True)))
+        monkeypatch.setattr("builtins.input", Mock(return_value="return shoes"))
+        run_automation = Mock()
+        monkeypatch.setattr(runner, automation, run_automation)
+        monkeypatch.setattr(runner.asyncio, "run", Mock(return_value=True))
+        
+        runner.main(runner.parse_args(["--phone", "+919876543210", "--no-headless"]))
+        
+        run_automation.assert_called_once_with("+919876543210", False, "return shoes")
+
 class TestUtils:
     """Utility functions for testing"""
     
@@ -417,8 +1113,8 @@ class TestUtils:
             'delivery_status': 'Delivered',
             'has_return_option': True,
             'has_replace_option': False,
-            'return_deadline': (datetime.now() + timedelta(days=days_until_deadline)).strftime('%Y-%m-%d'),
-            'scraped_at': datetime.now().isoformat()
+            'return_deadline': (_TODAY + timedelta(days=days_until_deadline)).isoformat(),
+            'scraped_at': _SCRAPED_AT
         }
 
 if __name__ == "__main__":
@@ -0,0 +1,63 @@
+"""
+Shared Playwright browser pool for the automation runners.
+Keeps one launched browser per headless mode and launch arguments so agents open cheap contexts instead of new browsers.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
+from playwright.async_api import async_playwright, Playwright, Browser
+import typer
+
+from config import Config
+
+_playwright: Optional[Playwright] = None
+_browsers: Dict[Tuple[bool, Tuple[str, ...]], Browser] = {}  # keyed by (headless, launch args)
+_launch_lock: Optional[asyncio.Lock] = None
+
+async def get_shared_browser(headless: bool = True, args: Optional[List[str]] = None) -> Tuple[Playwright, Browser]:
+    """Get the pooled browser for the given headless mode and args, launching it on first use"""
+    global _playwright, _launch_lock
+    
+    if _launch_lock is None:
+        _launch_lock = asyncio.Lock()
+    
+    async with _launch_lock:
+        if _playwright is None:
+            _playwright = await async_playwright().start()
+        
+        # Runners launching with different flags (e.g. stealth) must not share a browser
+        launch_args = tuple(args or Config.get_browser_options(headless)['args'])
+        key = (headless, launch_args)
+        browser = _browsers.get(key)
+        if browser is None or not browser.is_connected():
+            browser = await _playwright.chromium.launch(headless=headless, args=list(launch_args))
+            _browsers[key] = browser
+            typer.echo(f"🌐 Shared browser launched (headless={headless})")
+        
+        return _playwright, browser
+
+async def close_shared_browsers():
+    """Close every pooled browser and stop Playwright"""
+    global _playwright, _launch_lock
+    
+    for browser in list(_browsers.values()):
+        try:
+            await browser.close()
+        except Exception as e:
+            typer.echo(f"⚠️ Error closing shared browser: {str(e)}")
+    _browsers.clear()
+    
+    if _playwright is not None:
+        await _playwright.stop()
+        _playwright = None
+    _launch_lock = None
+
+@asynccontextmanager
+async def shared_browser_session(headless: bool = True, args: Optional[List[str]] = None):
+    """Yield (playwright, browser) from the pool and shut the pool down on exit"""
+    playwright, browser = await get_shared_browser(headless, args)
+    try:
+        yield playwright, browser
+    finally:
+        await close_shared_browsers()
@@ -5,19 +5,238 @@ Provides enhanced content extraction and parsing capabilities.
 
 import asyncio
 import aiohttp
-from typing import Dict, Any, List, Optional
-from bs4 import BeautifulSoup
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Union
+from bs4 import BeautifulSoup, Tag
 import re
+import sys
 import typer
 
+# Prefer selectolax's C parser for the hot extraction paths; BeautifulSoup remains the fallback
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser  # older selectolax without the lexbor backend
+        SELECTOLAX_AVAILABLE = True
+    except ImportError:
+        SELECTOLAX_AVAILABLE = False
+
+# aiohttp only decodes brotli responses when a brotli package is installed
+try:
+    import brotli  # noqa: F401
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Hyperscan scans for every pattern of a group in one pass; re alone is used without it
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+# Patterns are compiled once at import instead of going through re's cache on every call
+_AMOUNT = r'(\d+(?:,\d+)*(?:\.\d{2})?)'
+_PRICE_PATTERNS = [
+    re.compile(r'₹\s*' + _AMOUNT, re.IGNORECASE),
+    re.compile(r'Rs\.\s*' + _AMOUNT, re.IGNORECASE),
+    re.compile(r'INR\s*' + _AMOUNT, re.IGNORECASE)
+]
+_RUPEE_PRICE_RE = _PRICE_PATTERNS[0]
+_ORDER_ID_PATTERNS = [
+    re.compile(r'(?:Order\s*ID|Order\s*#|#)\s*:?\s*([A-Z0-9]+)', re.IGNORECASE),
+    re.compile(r'\b([A-Z]{2,}\d{6,})\b', re.IGNORECASE),
+    re.compile(r'\b(\d{10,})\b', re.IGNORECASE)
+]
+_ORDER_ID_LABEL_RE = re.compile(r'order\s*id', re.IGNORECASE)
+
+# Hyperscan's \s, \d and \b are ASCII-only, so its expressions widen them to stay a superset of re's
+_HYPERSCAN_TRANSLATIONS = [
+    (r'\s', r'[\s\x{1c}-\x{1f}\x{85}\x{a0}\x{1680}\x{2000}-\x{200a}\x{2028}\x{2029}\x{202f}\x{205f}\x{3000}]'),
+    (r'\d', r'\p{Nd}'),
+    (r'\b', '')
+]
+
+def _compile_prefilter(patterns: List[re.Pattern]):
+    """Hyperscan database reporting which of the patterns can match a text, or None without hyperscan"""
+    if not HYPERSCAN_AVAILABLE:
+        return None
+    
+    expressions = []
+    for pattern in patterns:
+        expression = pattern.pattern
+        for old, new in _HYPERSCAN_TRANSLATIONS:
+            expression = expression.replace(old, new)
+        expressions.append(expression.encode())
+    
+    try:
+        database = hyperscan.Database()
+        database.compile(
+            expressions=expressions,
+            ids=list(range(len(patterns))),
+            elements=len(patterns),
+            flags=hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_SINGLEMATCH
+        )
+        return database
+    except Exception as e:
+        typer.echo(f"⚠️ Hyperscan prefilter unavailable, using re only: {str(e)}")
+        return None
+
+_PRICE_PREFILTER = _compile_prefilter(_PRICE_PATTERNS)
+_ORDER_ID_PREFILTER = _compile_prefilter(_ORDER_ID_PATTERNS)
+
+def _first_match(patterns: List[re.Pattern], prefilter, text: str) -> Optional[re.Match]:
+    """Match of the first pattern, in priority order, found anywhere in the text"""
+    # Python's IGNORECASE folds non-ASCII letters such as 'ı' and 'İ' onto ASCII ones, which
+    # hyperscan's CASELESS does not; only pure-ASCII text is safe to prefilter
+    if prefilter is not None and text.isascii():
+        matched = set()
+        
+        def on_match(pattern_id, start, end, flags, context):
+            matched.add(pattern_id)
+            # Nothing outranks the first pattern, so stop scanning once it hits
+            return pattern_id == 0
+        
+        try:
+            prefilter.scan(text.encode(), match_event_handler=on_match)
+        except hyperscan.ScanTerminated:
+            pass  # on_match stopped the scan early
+        patterns = [patterns[pattern_id] for pattern_id in sorted(matched)]
+    
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            return match
+    return None
+
+def _class_selector(tags: List[str], words: List[str]) -> str:
+    """Union selector for tags whose class contains any of the words, case-insensitively"""
+    return ', '.join(f'{tag}[class*="{word}" i]' for tag in tags for word in words)
+
+# Order card selectors; the class filters run inside the parser instead of as Python regexes
+ORDER_CONTAINER_SELECTOR = _class_selector(['div', 'section'], ['order'])
+ORDER_NAME_SELECTOR = _class_selector(['h1', 'h2', 'h3', 'h4'], ['name', 'title'])
+ORDER_PRICE_SELECTOR = _class_selector(['span', 'div'], ['price', 'amount'])
+ORDER_STATUS_SELECTOR = _class_selector(['span', 'div'], ['status'])
+
+# One pass for clean_text: whitespace runs collapse to a space, other disallowed characters are dropped
+_CLEAN_RE = re.compile(r'(\s+)|[^\w\s₹.,()-]')
+
+def _clean_match(match: re.Match) -> str:
+    """Replacement for _CLEAN_RE matches"""
+    return ' ' if match.lastindex else ''
+
+# Pooled connections so repeated scrapes of the same host reuse TCP/TLS handshakes
+CONNECTOR_LIMIT = 100
+CONNECTOR_LIMIT_PER_HOST = 20
+DNS_CACHE_TTL = 300  # seconds
+KEEPALIVE_TIMEOUT = 60  # seconds
+REQUEST_TIMEOUT = 30  # seconds
+SCRAPE_CONCURRENCY = 20  # URLs in flight at once in scrape_urls
+
+# Recent parses are kept so extractors handed the same HTML string don't rebuild the tree
+PARSE_CACHE_SIZE = 8
+
+# Elements whose contents are code, never page text; BeautifulSoup's get_text() already skips them
+NON_TEXT_TAGS = ['script', 'style']
+_NON_TEXT_SELECTOR = ', '.join(NON_TEXT_TAGS)
+
+# lexbor keeps <template> contents out of css() results, where BeautifulSoup returns them
+_TEMPLATE_RE = re.compile(r'<template\b', re.IGNORECASE)
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_html(html_content: str):
+    """Parse HTML with selectolax when installed, otherwise with BeautifulSoup"""
+    # Pages with templates take the BeautifulSoup path so links and forms inside them are still found
+    if SELECTOLAX_AVAILABLE and not _TEMPLATE_RE.search(html_content):
+        return HTMLParser(html_content)
+    return BeautifulSoup(html_content, 'html.parser')
+
+def _as_tree(html_or_tree):
+    """Return a parsed tree, parsing only when given raw HTML"""
+    return _parse_html(html_or_tree) if isinstance(html_or_tree, str) else html_or_tree
+
+def _select(node, selector: str) -> list:
+    """All descendants of a BeautifulSoup or selectolax node matching a CSS selector"""
+    if isinstance(node, Tag):
+        return node.select(selector)
+    # selectolax also matches the node itself; BeautifulSoup only looks at descendants
+    return [match for match in node.css(selector) if match != node]
+
+def _select_one(node, selector: str):
+    """First descendant of a BeautifulSoup or selectolax node matching a CSS selector"""
+    if isinstance(node, Tag):
+        return node.select_one(selector)
+    match = node.css_first(selector)
+    if match is not None and match == node:
+        return next(iter(_select(node, selector)), None)
+    return match
+
+def _attr(node, name: str, default=''):
+    """Attribute value of a node, or default when missing or valueless"""
+    if isinstance(node, Tag):
+        return node.get(name, default)
+    value = node.attributes.get(name)
+    return default if value is None else value
+
+def _has_attr(node, name: str) -> bool:
+    """Whether a node carries an attribute, with or without a value"""
+    return name in (node.attrs if isinstance(node, Tag) else node.attributes)
+
+def _intern(value):
+    """Intern a categorical attribute value so repeats across a page share one string"""
+    # sys.intern rejects str subclasses, which BeautifulSoup uses for a few attributes
+    return sys.intern(value) if type(value) is str else value
+
+def _own_text(node) -> str:
+    """Text of a node's direct text children only"""
+    if isinstance(node, Tag):
+        return ''.join(node.find_all(string=True, recursive=False))
+    return node.text(deep=False)
+
+def _text(node) -> str:
+    """Stripped text content of a node, leaving out script and style bodies"""
+    if isinstance(node, Tag):
+        return node.get_text(strip=True)
+    # selectolax's text() includes code; strip it from a copy so the parsed tree stays intact for extractors
+    if node.css_first(_NON_TEXT_SELECTOR) is not None:
+        node = node.clone()
+        node.strip_tags(NON_TEXT_TAGS)
+    return node.text(strip=True)
+
 class CrawlHelper:
+    # Common selectors for product information, one union selector per field
+    PRODUCT_SELECTORS = {
+        'name': '.product-name, .item-name, h1, h2, .title',
+        'price': '.price, .amount, .cost, [class*="price"]',
+        'description': '.description, .product-desc, .details',
+        'rating': '.rating, .stars, [class*="rating"]',
+        'availability': '.stock, .availability, [class*="stock"]'
+    }
+    
+    DEFAULT_HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        'Accept-Encoding': 'gzip, deflate, br' if BROTLI_AVAILABLE else 'gzip, deflate'
+    }
+    
     def __init__(self):
         self.session = None
     
     async def get_session(self):
         """Get or create aiohttp session"""
         if self.session is None:
-            self.session = aiohttp.ClientSession()
+            connector = aiohttp.TCPConnector(
+                limit=CONNECTOR_LIMIT,
+                limit_per_host=CONNECTOR_LIMIT_PER_HOST,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=KEEPALIVE_TIMEOUT
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+            )
         return self.session
     
     async def close_session(self):
@@ -26,24 +245,35 @@ class CrawlHelper:
             await self.session.close()
             self.session = None
     
-    async def extract_page_content(self, page) -> Dict[str, Any]:
-        """Extract content from a Playwright page"""
+    async def page_text_only(self, page) -> str:
+        """Rendered body text straight from the browser, without fetching or parsing the HTML"""
+        return await page.inner_text('body')
+    
+    async def extract_page_content(self, page, text_only: bool = False) -> Dict[str, Any]:
+        """Extract content from a Playwright page; text_only skips links, images, forms and metadata"""
         try:
+            if text_only:
+                return {
+                    'title': await page.title(),
+                    'url': page.url,
+                    'text_content': await self.page_text_only(page)
+                }
+            
             # Get page HTML
             html_content = await page.content()
             
-            # Parse with BeautifulSoup
-            soup = BeautifulSoup(html_content, 'html.parser')
+            # Parse once with the fastest available parser
+            tree = _parse_html(html_content)
             
             # Extract structured data
             content = {
                 'title': await page.title(),
                 'url': page.url,
-                'text_content': soup.get_text(strip=True),
-                'links': self.extract_links(soup),
+                'text_content': _text(tree),
+                'links': self.extract_links(tree),
                 'images': await self.extract_images(page),
-                'forms': self.extract_forms(soup),
-                'metadata': self.extract_metadata(soup)
+                'forms': self.extract_forms(tree),
+                'metadata': self.extract_metadata(tree)
             }
             
             return content
@@ -52,137 +282,115 @@ class CrawlHelper:
             typer.echo(f"❌ Error extracting page content: {str(e)}")
             return {}
     
-    def extract_links(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
-        """Extract all links from the page"""
-        links = []
-        
-        for link in soup.find_all('a', href=True):
-            links.append({
-                'url': link['href'],
-                'text': link.get_text(strip=True),
-                'title': link.get('title', '')
-            })
-        
-        return links
+    def extract_links(self, tree) -> List[Dict[str, str]]:
+        """Extract all links from the page (BeautifulSoup or selectolax tree)"""
+        return [
+            {
+                'url': _attr(link, 'href'),
+                'text': _text(link),
+                'title': _attr(link, 'title')
+            }
+            for link in _select(tree, 'a[href]')
+        ]
     
     async def extract_images(self, page) -> List[Dict[str, str]]:
-        """Extract image information from the page"""
-        images = []
-        
+        """Extract image information from the page in a single browser round-trip"""
         try:
-            img_elements = await page.query_selector_all('img')
-            
-            for img in img_elements:
-                src = await img.get_attribute('src')
-                alt = await img.get_attribute('alt')
-                title = await img.get_attribute('title')
-                
-                if src:
-                    images.append({
-                        'src': src,
-                        'alt': alt or '',
-                        'title': title or ''
-                    })
+            return await page.evaluate("""
+                () => Array.from(document.querySelectorAll('img'))
+                    .map(img => ({
+                        src: img.getAttribute('src') || '',
+                        alt: img.getAttribute('alt') || '',
+                        title: img.getAttribute('title') || ''
+                    }))
+                    .filter(img => img.src)
+            """)
         
         except Exception as e:
             typer.echo(f"⚠️ Error extracting images: {str(e)}")
-        
-        return images
+            return []
     
-    def extract_forms(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
-        """Extract form information from the page"""
-        forms = []
-        
-        for form in soup.find_all('form'):
-            form_data = {
-                'action': form.get('action', ''),
-                'method': form.get('method', 'GET'),
-                'inputs': []
+    def extract_forms(self, tree) -> List[Dict[str, Any]]:
+        """Extract form information from the page (BeautifulSoup or selectolax tree)"""
+        return [
+            {
+                'action': _attr(form, 'action'),
+                'method': _intern(_attr(form, 'method', 'GET')),
+                # All field kinds come back from one union selector, in document order
+                'inputs': [
+                    {
+                        'type': _intern(_attr(input_field, 'type')),
+                        'name': _attr(input_field, 'name'),
+                        'placeholder': _attr(input_field, 'placeholder'),
+                        'required': _has_attr(input_field, 'required')
+                    }
+                    for input_field in _select(form, 'input, select, textarea')
+                ]
             }
-            
-            # Extract input fields
-            for input_field in form.find_all(['input', 'select', 'textarea']):
-                field_info = {
-                    'type': input_field.get('type', ''),
-                    'name': input_field.get('name', ''),
-                    'placeholder': input_field.get('placeholder', ''),
-                    'required': input_field.has_attr('required')
-                }
-                form_data['inputs'].append(field_info)
-            
-            forms.append(form_data)
-        
-        return forms
+            for form in _select(tree, 'form')
+        ]
     
-    def extract_metadata(self, soup: BeautifulSoup) -> Dict[str, str]:
-        """Extract metadata from the page"""
+    def extract_metadata(self, tree) -> Dict[str, str]:
+        """Extract metadata from the page (BeautifulSoup or selectolax tree)"""
         metadata = {}
         
         # Extract meta tags
-        for meta in soup.find_all('meta'):
-            name = meta.get('name') or meta.get('property') or meta.get('http-equiv')
-            content = meta.get('content')
+        for meta in _select(tree, 'meta'):
+            name = _attr(meta, 'name', None) or _attr(meta, 'property', None) or _attr(meta, 'http-equiv', None)
+            content = _attr(meta, 'content', None)
             
             if name and content:
                 metadata[name] = content
         
         return metadata
     
-    def extract_product_info(self, html_content: str) -> Dict[str, Any]:
-        """Extract product information from HTML content"""
-        soup = BeautifulSoup(html_content, 'html.parser')
+    def extract_product_info(self, html_or_tree: Union[str, Any]) -> Dict[str, Any]:
+        """Extract product information from HTML content or an already-parsed tree"""
+        tree = _as_tree(html_or_tree)
         product_info = {}
         
-        # Common selectors for product information
-        selectors = {
-            'name': ['.product-name', '.item-name', 'h1', 'h2', '.title'],
-            'price': ['.price', '.amount', '.cost', '[class*="price"]'],
-            'description': ['.description', '.product-desc', '.details'],
-            'rating': ['.rating', '.stars', '[class*="rating"]'],
-            'availability': ['.stock', '.availability', '[class*="stock"]']
-        }
-        
-        for field, field_selectors in selectors.items():
-            for selector in field_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    product_info[field] = element.get_text(strip=True)
-                    break
+        # One traversal per field; the first match in document order wins
+        for field, selector in self.PRODUCT_SELECTORS.items():
+            element = _select_one(tree, selector)
+            if element:
+                product_info[field] = _text(element)
         
         return product_info
     
-    def extract_order_details(self, html_content: str) -> List[Dict[str, Any]]:
-        """Extract order details from HTML content"""
-        soup = BeautifulSoup(html_content, 'html.parser')
+    def extract_order_details(self, html_or_tree: Union[str, Any]) -> List[Dict[str, Any]]:
+        """Extract order details from HTML content or an already-parsed tree"""
+        tree = _as_tree(html_or_tree)
         orders = []
         
         # Find order containers
-        order_containers = soup.find_all(['div', 'section'], class_=re.compile(r'order', re.I))
-        
-        for container in order_containers:
+        for container in _select(tree, ORDER_CONTAINER_SELECTOR):
             order = {}
             
-            # Extract order ID
-            order_id_element = container.find(['span', 'div'], string=re.compile(r'order\s*id', re.I))
-            if order_id_element:
-                order['order_id'] = re.search(r'[A-Z0-9]+', order_id_element.get_text()).group()
+            # Extract order ID from the element labelled "Order ID"
+            for element in _select(container, 'span, div'):
+                label_text = _own_text(element)
+                if _ORDER_ID_LABEL_RE.search(label_text):
+                    order_id_match = _ORDER_ID_PATTERNS[0].search(label_text)
+                    if order_id_match:
+                        order['order_id'] = order_id_match.group(1)
+                    break
             
             # Extract product name
-            name_element = container.find(['h1', 'h2', 'h3', 'h4'], class_=re.compile(r'name|title', re.I))
+            name_element = _select_one(container, ORDER_NAME_SELECTOR)
             if name_element:
-                order['product_name'] = name_element.get_text(strip=True)
+                order['product_name'] = _text(name_element)
             
             # Extract price
-            price_element = container.find(['span', 'div'], class_=re.compile(r'price|amount', re.I))
+            price_element = _select_one(container, ORDER_PRICE_SELECTOR)
             if price_element:
-                price_match = re.search(r'₹\s*(\d+(?:,\d+)*(?:\.\d{2})?)', price_element.get_text())
+                price_match = _RUPEE_PRICE_RE.search(_text(price_element))
                 if price_match:
                     order['price'] = f"₹{price_match.group(1)}"
             
             # Extract status
-            status_element = container.find(['span', 'div'], class_=re.compile(r'status', re.I))
+            status_element = _select_one(container, ORDER_STATUS_SELECTOR)
             if status_element:
-                order['delivery_status'] = status_element.get_text(strip=True)
+                order['delivery_status'] = _text(status_element)
             
             if order:
                 orders.append(order)
@@ -194,21 +402,18 @@ class CrawlHelper:
         try:
             session = await self.get_session()
             
-            if not headers:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                }
-            
-            async with session.get(url, headers=headers) as response:
+            async with session.get(url, headers=headers or self.DEFAULT_HEADERS) as response:
                 if response.status == 200:
-                    html_content = await response.text()
+                    # Decode once with the response charset so the text and the tree agree; the bytes are not kept
+                    html_content = (await response.read()).decode(response.get_encoding(), errors='replace')
+                    tree = _parse_html(html_content)
                     
                     return {
                         'url': url,
                         'status': response.status,
                         'html_content': html_content,
-                        'product_info': self.extract_product_info(html_content),
-                        'orders': self.extract_order_details(html_content)
+                        'product_info': self.extract_product_info(tree),
+                        'orders': self.extract_order_details(tree)
                     }
                 else:
                     return {
@@ -223,45 +428,30 @@ class CrawlHelper:
                 'error': str(e)
             }
     
+    async def scrape_urls(self, urls: List[str], concurrency: int = SCRAPE_CONCURRENCY) -> List[Dict[str, Any]]:
+        """Scrape several URLs concurrently over the pooled session, results in input order"""
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def scrape_one(url: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.scrape_url(url)
+        
+        return await asyncio.gather(*(scrape_one(url) for url in urls))
+    
     def clean_text(self, text: str) -> str:
         """Clean and normalize text content"""
         if not text:
             return ""
         
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove special characters
-        text = re.sub(r'[^\w\s₹.,()-]', '', text)
-        
-        return text.strip()
+        # Collapse whitespace and remove special characters in a single scan
+        return _CLEAN_RE.sub(_clean_match, text).strip()
     
     def extract_price_from_text(self, text: str) -> Optional[str]:
         """Extract price from text using regex patterns"""
-        price_patterns = [
-            r'₹\s*(\d+(?:,\d+)*(?:\.\d{2})?)',
-            r'Rs\.\s*(\d+(?:,\d+)*(?:\.\d{2})?)',
-            r'INR\s*(\d+(?:,\d+)*(?:\.\d{2})?)'
-        ]
-        
-        for pattern in price_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return f"₹{match.group(1)}"
-        
-        return None
+        match = _first_match(_PRICE_PATTERNS, _PRICE_PREFILTER, text)
+        return f"₹{match.group(1)}" if match else None
     
     def extract_order_id_from_text(self, text: str) -> Optional[str]:
         """Extract order ID from text using regex patterns"""
-        order_id_patterns = [
-            r'(?:Order\s*ID|Order\s*#|#)\s*:?\s*([A-Z0-9]+)',
-            r'\b([A-Z]{2,}\d{6,})\b',
-            r'\b(\d{10,})\b'
-        ]
-        
-        for pattern in order_id_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1)
-        
-        return None
+        match = _first_match(_ORDER_ID_PATTERNS, _ORDER_ID_PREFILTER, text)
+        return match.group(1) if match else None
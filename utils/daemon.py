@@ -0,0 +1,111 @@
+"""
+Long-running automation daemon serving JSON commands over a Unix socket.
+Keeps the database initialized and its connection warm so repeated CLI checks skip the cold start.
+"""
+
+import asyncio
+import json
+import os
+import socket
+from typing import Any, Optional
+import typer
+
+# orjson encodes straight to bytes in C; the stdlib json module is the fallback
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+SOCKET_PATH = os.getenv("AJIO_SOCKET", "/tmp/ajio.sock")
+CLIENT_TIMEOUT = 5.0  # seconds
+OPTIMIZE_INTERVAL = 15 * 60  # seconds between PRAGMA optimize runs while serving
+
+def _encode_line(message: Any) -> bytes:
+    """Encode a message as one newline-terminated JSON line"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(message, default=str) + b'\n'
+    return json.dumps(message, default=str).encode() + b'\n'
+
+_decode = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+async def serve(socket_path: str = SOCKET_PATH):
+    """Initialize the database, then answer commands until interrupted"""
+    from agents.reminder_agent import ReminderAgent
+    from utils.database import init_database, optimize_database
+    
+    init_database()
+    reminder_agent = ReminderAgent()
+    
+    handlers = {
+        'check_reminders': reminder_agent.check_reminders,
+        'list_orders': reminder_agent.get_all_orders,
+        'ping': lambda: 'pong',
+    }
+    
+    async def optimize_periodically():
+        while True:
+            await asyncio.sleep(OPTIMIZE_INTERVAL)
+            await asyncio.to_thread(optimize_database)
+    
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = _decode(await reader.readline() or b'{}')
+            handler = handlers.get(request.get('command'))
+            if handler is None:
+                response = {'ok': False, 'error': f"Unknown command: {request.get('command')}"}
+            else:
+                response = {'ok': True, 'result': await asyncio.to_thread(handler)}
+        except Exception as e:
+            response = {'ok': False, 'error': str(e)}
+        
+        writer.write(_encode_line(response))
+        await writer.drain()
+        writer.close()
+    
+    if os.path.exists(socket_path):
+        # Only a stale file left by a daemon that died is removed; a live one keeps its socket
+        if await asyncio.to_thread(request, 'ping', socket_path) == 'pong':
+            typer.echo(f"❌ A daemon is already listening on {socket_path}")
+            return
+        os.unlink(socket_path)
+    
+    server = await asyncio.start_unix_server(handle, path=socket_path)
+    typer.echo(f"🛰️ Daemon listening on {socket_path}")
+    
+    optimize_task = asyncio.create_task(optimize_periodically())
+    
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        optimize_task.cancel()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+def request(command: str, socket_path: str = SOCKET_PATH) -> Optional[Any]:
+    """Send a command to a running daemon; returns None when no daemon answers"""
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(socket_path):
+        return None
+    
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(CLIENT_TIMEOUT)
+            client.connect(socket_path)
+            client.sendall(_encode_line({'command': command}))
+            
+            data = b''
+            while not data.endswith(b'\n'):
+                chunk = client.recv(65536)
+                if not chunk:
+                    break
+                data += chunk
+        
+        response = _decode(data)
+    except (OSError, ValueError):
+        return None
+    
+    if not response.get('ok'):
+        typer.echo(f"⚠️ Daemon error: {response.get('error')}")
+        return None
+    return response.get('result')
@@ -5,20 +5,68 @@ Handles database initialization, connections, and migrations.
 
 import sqlite3
 import os
+import threading
 from contextlib import contextmanager
-from typing import Optional
+from typing import Iterable, Optional
 import typer
 
 DATABASE_PATH = "orders.db"
 
+# Applied to every new connection: WAL lets readers run alongside the writer and,
+# with synchronous=NORMAL, avoids an fsync per commit; ~64 MB page cache, memory-mapped
+# reads and a busy timeout so concurrent writers wait instead of failing with "database is locked"
+CONNECTION_PRAGMAS = """
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-64000;
+    PRAGMA mmap_size=268435456;
+    PRAGMA busy_timeout=5000;
+"""
+
+# journal_mode=WAL is stored in the database file, so it is only set on the first connect per path
+_wal_paths = set()
+
+# Prepared statements kept per connection; the pooled connections live long enough for them to hit
+STATEMENT_CACHE_SIZE = 256
+
+# Free pages released per vacuum_database call on incremental auto-vacuum databases
+INCREMENTAL_VACUUM_PAGES = 1000
+
+# Online backups copy this many pages per step, releasing the source lock in between so
+# writers are not blocked for the whole copy; a busy step is retried after BACKUP_RETRY_SLEEP seconds
+BACKUP_PAGES_PER_STEP = 1024
+BACKUP_RETRY_SLEEP = 0.05
+
+# Each thread keeps one open connection per database path instead of reconnecting per call
+_local = threading.local()
+
+# Paths whose schema has already been created by this process
+_initialized_paths = set()
+
+# Secondary indexes on orders; bulk imports drop these and rebuild them once afterwards.
+# order_id uniqueness is enforced by the table's own UNIQUE index, which is never dropped.
+ORDER_INDEXES = {
+    'idx_orders_order_id': "CREATE INDEX IF NOT EXISTS idx_orders_order_id ON orders(order_id)",
+    'idx_orders_deadline': "CREATE INDEX IF NOT EXISTS idx_orders_deadline ON orders(return_deadline)",
+    # Newest-first listing walks this index instead of sorting the table
+    'idx_orders_scraped_at': "CREATE INDEX IF NOT EXISTS idx_orders_scraped_at ON orders(scraped_at)",
+    # Cover the statistics counts, so they are answered from the index alone
+    'idx_orders_status_deadline': "CREATE INDEX IF NOT EXISTS idx_orders_status_deadline ON orders(delivery_status, return_deadline)",
+    'idx_orders_returnable': "CREATE INDEX IF NOT EXISTS idx_orders_returnable ON orders(has_return_option)",
+}
+
 def init_database():
-    """Initialize the SQLite database with required tables"""
+    """Initialize the SQLite database with required tables, once per process"""
+    if DATABASE_PATH in _initialized_paths:
+        return
+    
     try:
         with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Create orders table
-            cursor.execute("""
+            # All DDL goes through one script in one transaction: a single parse pass and one commit
+            conn.executescript(f"""
+                BEGIN;
+                
+                -- Orders scraped from the account pages
                 CREATE TABLE IF NOT EXISTS orders (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     order_id TEXT UNIQUE NOT NULL,
@@ -31,11 +79,9 @@ def init_database():
                     return_deadline TEXT,
                     scraped_at TEXT,
                     updated_at TEXT
-                )
-            """)
-            
-            # Create sessions table for storing login sessions
-            cursor.execute("""
+                );
+                
+                -- Stored login sessions
                 CREATE TABLE IF NOT EXISTS sessions (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     phone_number TEXT,
@@ -43,11 +89,9 @@ def init_database():
                     created_at TEXT,
                     expires_at TEXT,
                     is_active INTEGER DEFAULT 1
-                )
-            """)
-            
-            # Create reminders table for tracking notifications
-            cursor.execute("""
+                );
+                
+                -- Reminder notifications
                 CREATE TABLE IF NOT EXISTS reminders (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     order_id TEXT NOT NULL,
@@ -56,36 +100,78 @@ def init_database():
                     is_sent INTEGER DEFAULT 0,
                     created_at TEXT,
                     FOREIGN KEY (order_id) REFERENCES orders (order_id)
-                )
+                );
+                
+                -- AI analysis cache keyed by page-structure fingerprint
+                CREATE TABLE IF NOT EXISTS ai_cache (
+                    key TEXT PRIMARY KEY,
+                    analysis TEXT NOT NULL,
+                    ts INTEGER NOT NULL
+                );
+                
+                -- Indexes for better performance
+                {';'.join(ORDER_INDEXES.values())};
+                CREATE INDEX IF NOT EXISTS idx_reminders_date ON reminders(reminder_date);
+                
+                COMMIT;
+                
+                -- Gather planner statistics for the new indexes where needed
+                PRAGMA optimize=0x10002;
             """)
-            
-            # Create indexes for better performance
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_order_id ON orders(order_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_deadline ON orders(return_deadline)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_reminders_date ON reminders(reminder_date)")
-            
-            conn.commit()
+            _initialized_paths.add(DATABASE_PATH)
             typer.echo("✅ Database initialized successfully")
             
     except Exception as e:
         typer.echo(f"❌ Error initializing database: {str(e)}")
         raise
 
+def drop_order_indexes(conn: sqlite3.Connection):
+    """Drop the secondary orders indexes ahead of a bulk import"""
+    for name in ORDER_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+def create_order_indexes(conn: sqlite3.Connection):
+    """Create the secondary orders indexes if they are missing"""
+    for ddl in ORDER_INDEXES.values():
+        conn.execute(ddl)
+
+def _open_connection(path: str) -> sqlite3.Connection:
+    """Open a connection to path with the row factory and PRAGMAs applied"""
+    conn = sqlite3.connect(path, cached_statements=STATEMENT_CACHE_SIZE)
+    conn.row_factory = sqlite3.Row  # Enable column access by name
+    if path not in _wal_paths:
+        # auto_vacuum only sticks on a brand-new file, before WAL mode writes its header;
+        # on existing databases it is a no-op until the next full VACUUM
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        _wal_paths.add(path)
+    conn.executescript(CONNECTION_PRAGMAS)
+    return conn
+
 @contextmanager
 def get_db_connection():
-    """Get database connection with automatic cleanup"""
-    conn = None
+    """Get this thread's pooled database connection, leaving no transaction open afterwards"""
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    
+    conn = connections.get(DATABASE_PATH)
+    if conn is None:
+        conn = connections[DATABASE_PATH] = _open_connection(DATABASE_PATH)
+    
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.row_factory = sqlite3.Row  # Enable column access by name
         yield conn
-    except Exception as e:
-        if conn:
-            conn.rollback()
-        raise e
     finally:
-        if conn:
-            conn.close()
+        # Uncommitted work is discarded, as closing a per-call connection used to do
+        if conn.in_transaction:
+            conn.rollback()
+
+def close_db_connections():
+    """Close the calling thread's pooled connections"""
+    for conn in getattr(_local, 'connections', {}).values():
+        conn.execute("PRAGMA optimize")  # recommended by SQLite before closing a long-lived connection
+        conn.close()
+    _local.connections = {}
 
 def execute_query(query: str, params: tuple = (), fetch: bool = False):
     """Execute a database query with parameters"""
@@ -104,6 +190,19 @@ def execute_query(query: str, params: tuple = (), fetch: bool = False):
         typer.echo(f"❌ Database query error: {str(e)}")
         return None
 
+def execute_many_query(query: str, seq_of_params: Iterable[tuple]):
+    """Execute one prepared statement for every parameter tuple in a single transaction"""
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(query, seq_of_params)
+            conn.commit()
+            return cursor.rowcount
+            
+    except Exception as e:
+        typer.echo(f"❌ Database query error: {str(e)}")
+        return None
+
 def backup_database(backup_path: Optional[str] = None):
     """Create a backup of the database"""
     if not backup_path:
@@ -112,8 +211,13 @@ def backup_database(backup_path: Optional[str] = None):
         backup_path = f"orders_backup_{timestamp}.db"
     
     try:
-        import shutil
-        shutil.copy2(DATABASE_PATH, backup_path)
+        # The online backup API includes commits still in the WAL file, which a file copy would miss
+        with get_db_connection() as conn:
+            target = sqlite3.connect(backup_path)
+            try:
+                conn.backup(target, pages=BACKUP_PAGES_PER_STEP, sleep=BACKUP_RETRY_SLEEP)
+            finally:
+                target.close()
         typer.echo(f"✅ Database backed up to: {backup_path}")
         return backup_path
     except Exception as e:
@@ -123,9 +227,14 @@ def backup_database(backup_path: Optional[str] = None):
 def restore_database(backup_path: str):
     """Restore database from backup"""
     try:
-        import shutil
         if os.path.exists(backup_path):
-            shutil.copy2(backup_path, DATABASE_PATH)
+            # Copy pages into the live database so pooled connections and the WAL stay consistent
+            source = sqlite3.connect(backup_path)
+            try:
+                with get_db_connection() as conn:
+                    source.backup(conn, pages=BACKUP_PAGES_PER_STEP, sleep=BACKUP_RETRY_SLEEP)
+            finally:
+                source.close()
             typer.echo(f"✅ Database restored from: {backup_path}")
             return True
         else:
@@ -145,16 +254,25 @@ def get_database_info():
             cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
             tables = [row[0] for row in cursor.fetchall()]
             
+            # Size from the page count in SQLite's own header instead of a stat() of the file;
+            # it also covers pages still in the WAL that have not been checkpointed yet
+            cursor.execute("SELECT page_count * page_size FROM pragma_page_count(), pragma_page_size()")
+            
             info = {
                 'database_path': DATABASE_PATH,
-                'database_size': os.path.getsize(DATABASE_PATH) if os.path.exists(DATABASE_PATH) else 0,
+                'database_size': cursor.fetchone()[0],
                 'tables': tables
             }
             
-            # Get row counts for each table
-            for table in tables:
-                cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                info[f'{table}_count'] = cursor.fetchone()[0]
+            # Get row counts for every table in one compound query; names are bound as
+            # parameters for the labels and quoted as identifiers for the FROM clauses
+            if tables:
+                count_query = " UNION ALL ".join(
+                    'SELECT ?, COUNT(*) FROM "{}"'.format(table.replace('"', '""')) for table in tables
+                )
+                cursor.execute(count_query, tables)
+                for table, count in cursor.fetchall():
+                    info[f'{table}_count'] = count
             
             return info
             
@@ -162,11 +280,30 @@ def get_database_info():
         typer.echo(f"❌ Error getting database info: {str(e)}")
         return {}
 
+def optimize_database():
+    """Let SQLite refresh planner statistics where they are stale"""
+    try:
+        with get_db_connection() as conn:
+            # 0x10000 checks every table, not only those this connection queried (ignored before SQLite 3.46)
+            conn.execute("PRAGMA optimize=0x10002")
+        return True
+    except Exception as e:
+        typer.echo(f"❌ Error optimizing query planner: {str(e)}")
+        return False
+
 def vacuum_database():
-    """Optimize database by running VACUUM"""
+    """Reclaim free pages and refresh planner statistics"""
     try:
         with get_db_connection() as conn:
-            conn.execute("VACUUM")
+            # Incremental databases give pages back without rewriting the file under an exclusive lock;
+            # older files still get a full VACUUM, which also switches them to incremental mode
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                # executescript steps the pragma to completion; execute() frees a single page
+                conn.executescript(f"PRAGMA incremental_vacuum({INCREMENTAL_VACUUM_PAGES});")
+            else:
+                conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                conn.execute("VACUUM")
+            conn.execute("PRAGMA optimize")
             typer.echo("✅ Database optimized")
             return True
     except Exception as e:
@@ -174,37 +311,32 @@ def vacuum_database():
         return False
 
 def migrate_database():
-    """Handle database migrations for schema updates"""
+    """Handle database migrations for schema updates, tracked in PRAGMA user_version"""
     try:
         with get_db_connection() as conn:
-            cursor = conn.cursor()
+            # Check current schema version; at least 1 once the base schema exists
+            current_version = max(conn.execute("PRAGMA user_version").fetchone()[0], 1)
             
-            # Check current schema version
-            try:
-                cursor.execute("SELECT value FROM metadata WHERE key = 'schema_version'")
-                version = cursor.fetchone()
-                current_version = int(version[0]) if version else 0
-            except:
-                # Create metadata table if it doesn't exist
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS metadata (
-                        key TEXT PRIMARY KEY,
-                        value TEXT
-                    )
-                """)
-                cursor.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES ('schema_version', '1')")
-                current_version = 1
+            # Carry the version over from the metadata table older databases used, then drop it
+            has_metadata = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'metadata'"
+            ).fetchone()
+            if has_metadata:
+                row = conn.execute("SELECT value FROM metadata WHERE key = 'schema_version'").fetchone()
+                if row:
+                    current_version = max(current_version, int(row[0]))
+                conn.execute("DROP TABLE metadata")
             
             # Apply migrations based on current version
             if current_version < 2:
                 # Example migration - add new column
-                try:
-                    cursor.execute("ALTER TABLE orders ADD COLUMN tags TEXT")
-                    cursor.execute("UPDATE metadata SET value = '2' WHERE key = 'schema_version'")
+                columns = {column[1] for column in conn.execute("PRAGMA table_info(orders)")}
+                if 'tags' not in columns:
+                    conn.execute("ALTER TABLE orders ADD COLUMN tags TEXT")
                     typer.echo("✅ Applied migration: Added tags column")
-                except:
-                    pass  # Column might already exist
+                current_version = 2
             
+            conn.execute(f"PRAGMA user_version = {current_version}")
             conn.commit()
             typer.echo("✅ Database migrations completed")
             
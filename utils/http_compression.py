@@ -0,0 +1,56 @@
+"""
+Response compression for the Flask web applications.
+Encodes buffered text and JSON responses with brotli or gzip, reusing the encoded bytes of repeated bodies.
+"""
+
+import gzip
+from functools import lru_cache
+from flask import Flask, request
+
+# brotli gives smaller API responses than gzip; gzip from the stdlib is the fallback
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+COMPRESS_MIN_SIZE = 256  # bytes; smaller bodies are not worth the encoding overhead
+COMPRESS_LEVEL = 4  # brotli quality / gzip level, favouring speed over the last few percent
+COMPRESS_MIMETYPES = {'application/json', 'text/html', 'text/css', 'text/javascript'}
+
+@lru_cache(maxsize=64)
+def _compress(body: bytes, encoding: str) -> bytes:
+    """Encode a body; static payloads such as the dashboard and config are only encoded once"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=COMPRESS_LEVEL)
+    return gzip.compress(body, compresslevel=COMPRESS_LEVEL, mtime=0)
+
+def _choose_encoding():
+    """Pick the best encoding the client accepts, or None"""
+    if BROTLI_AVAILABLE and request.accept_encodings['br']:
+        return 'br'
+    if request.accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+def compress_response(response):
+    """after_request hook compressing buffered responses with a compressible mimetype"""
+    # Streamed bodies are left alone so each chunk still reaches the client as soon as it is produced
+    if (response.status_code != 200 or response.is_streamed or response.direct_passthrough
+            or response.mimetype not in COMPRESS_MIMETYPES or 'Content-Encoding' in response.headers):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    encoding = _choose_encoding()
+    body = response.get_data()
+    if encoding is None or len(body) < COMPRESS_MIN_SIZE:
+        return response
+    
+    # set_data() also sets Content-Length to the encoded size
+    response.set_data(_compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+def install_compression(app: Flask):
+    """Compress the app's buffered text and JSON responses"""
+    app.after_request(compress_response)
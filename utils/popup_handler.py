@@ -4,12 +4,129 @@ Uses intelligent detection and dismissal strategies.
 """
 
 import asyncio
-from typing import List, Dict
-from playwright.async_api import Page
+import re
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
+from playwright.async_api import Page, BrowserContext
 import typer
 
+from config import Config
+
+# Playwright's :has-text() is not CSS, so those selectors are split into a CSS part and a text filter
+_HAS_TEXT_RE = re.compile(r'^(.*):has-text\("(.*)"\)$')
+
+# Walks every candidate selector in one browser-side pass and returns the index of the first one
+# whose first match is visible, or -1. Text filters follow :has-text(): case-insensitive substring
+# of the whitespace-normalized text; visibility follows Playwright's non-empty box + visibility check
+FIND_VISIBLE_POPUP_JS = """
+(entries) => {
+    const normalize = text => (text || '').replace(/\\s+/g, ' ').trim().toLowerCase();
+    const isVisible = element => {
+        const rect = element.getBoundingClientRect();
+        return getComputedStyle(element).visibility === 'visible' && rect.width > 0 && rect.height > 0;
+    };
+    for (let index = 0; index < entries.length; index++) {
+        const [css, text] = entries[index];
+        let candidates;
+        try {
+            candidates = document.querySelectorAll(css);
+        } catch (e) {
+            continue;
+        }
+        const element = Array.from(candidates).find(
+            candidate => text === null || normalize(candidate.textContent).includes(text)
+        );
+        if (element && isVisible(element)) {
+            return index;
+        }
+    }
+    return -1;
+}
+"""
+
+# Collects every visible element matching any indicator selector in one pass; index is the
+# element's position among its selector's matches so a locator can find it again later
+DETECT_POPUPS_JS = """
+(selectors) => {
+    const isVisible = element => {
+        const rect = element.getBoundingClientRect();
+        return getComputedStyle(element).visibility === 'visible' && rect.width > 0 && rect.height > 0;
+    };
+    return selectors.flatMap(selector =>
+        Array.from(document.querySelectorAll(selector))
+            .map((element, index) => ({element, index}))
+            .filter(({element}) => isVisible(element))
+            .map(({element, index}) => ({
+                selector,
+                index,
+                tag_name: element.tagName,
+                class_name: element.getAttribute('class') || ''
+            }))
+    );
+}
+"""
+
+# Name of the exposed function the page calls with the index of a visible popup control
+POPUP_BINDING = '__ajioPopupCandidate'
+
+# Installs a MutationObserver that re-runs the visibility check whenever the DOM changes
+# (debounced) and reports hits through the binding; an earlier observer is replaced
+OBSERVE_POPUPS_JS = """
+({binding, entries, debounceMs}) => {
+    const findVisiblePopup = """ + FIND_VISIBLE_POPUP_JS.strip() + """;
+    let scheduled = false;
+    const check = () => {
+        scheduled = false;
+        const index = findVisiblePopup(entries);
+        if (index >= 0) {
+            window[binding](index);
+        }
+    };
+    const schedule = () => {
+        if (!scheduled) {
+            scheduled = true;
+            setTimeout(check, debounceMs);
+        }
+    };
+    if (window.__ajioPopupObserver) {
+        window.__ajioPopupObserver.disconnect();
+    }
+    window.__ajioPopupObserver = new MutationObserver(schedule);
+    window.__ajioPopupObserver.observe(document.documentElement, {
+        childList: true, subtree: true, attributes: true, attributeFilter: ['style', 'class', 'hidden']
+    });
+    schedule();
+}
+"""
+
+STOP_OBSERVING_POPUPS_JS = """
+() => {
+    if (window.__ajioPopupObserver) {
+        window.__ajioPopupObserver.disconnect();
+        window.__ajioPopupObserver = null;
+    }
+}
+"""
+
+OBSERVER_DEBOUNCE_MS = 250
+POPUP_CLICK_TIMEOUT = 500  # ms a dismiss control gets to become actionable before the click is abandoned
+
+@lru_cache(maxsize=None)
+def _selector_entry(selector: str) -> Tuple[str, Optional[str]]:
+    """Split a Playwright selector into the CSS part and an optional lowercased :has-text() filter"""
+    match = _HAS_TEXT_RE.match(selector)
+    if match:
+        return match.group(1) or '*', match.group(2).lower()
+    return selector, None
+
 class PopupHandler:
     def __init__(self):
+        # Pages with the popup binding exposed, mapped to the queue their observer reports into
+        self._popup_queues: Dict[Page, asyncio.Queue] = {}
+        
+        # Set once install_context_policies() has denied notifications for the agent's context
+        self.context_policies_installed = False
+        
         # Common popup selectors and their dismissal strategies
         self.popup_strategies = [
             {
@@ -69,6 +186,10 @@ class PopupHandler:
                 ]
             }
         ]
+        
+        # Each strategy's selectors as one comma-separated union, resolved in a single engine pass
+        for strategy in self.popup_strategies:
+            strategy['union'] = ', '.join(strategy['selectors'])
     
     async def dismiss_popups(self, page: Page, max_attempts: int = 3) -> List[str]:
         """Main method to dismiss all detected popups"""
@@ -80,18 +201,14 @@ class PopupHandler:
             # Wait a moment for popups to appear
             await asyncio.sleep(2)
             
-            popups_found = False
-            
             # Try each popup strategy
-            for strategy in self.popup_strategies:
-                if await self.try_dismiss_popup(page, strategy):
-                    dismissed_popups.append(strategy['name'])
-                    popups_found = True
-                    typer.echo(f"✅ Dismissed: {strategy['name']}")
-                    await asyncio.sleep(1)  # Wait between dismissals
+            dismissed = await self.dismiss_round(page, self.popup_strategies)
+            for name in dismissed:
+                typer.echo(f"✅ Dismissed: {name}")
+            dismissed_popups.extend(dismissed)
             
             # If no popups found in this attempt, we're likely done
-            if not popups_found:
+            if not dismissed:
                 break
         
         if dismissed_popups:
@@ -101,26 +218,54 @@ class PopupHandler:
         
         return dismissed_popups
     
+    async def find_visible_popup(self, page: Page, strategies: List[Dict]) -> Optional[Tuple[Dict, str]]:
+        """Find the first strategy with a visible dismiss control, checking every selector in one round trip"""
+        candidates = [(strategy, selector) for strategy in strategies for selector in strategy['selectors']]
+        
+        try:
+            index = await page.evaluate(
+                FIND_VISIBLE_POPUP_JS,
+                [_selector_entry(selector) for _, selector in candidates]
+            )
+        except Exception:
+            return None
+        
+        return candidates[index] if index >= 0 else None
+    
+    async def click_popup_control(self, page: Page, selector: str) -> bool:
+        """Click the first visible dismiss control matched by a popup selector"""
+        # The locator click waits for visibility, stability and hit-testing browser-side in one call
+        try:
+            await page.locator(selector).filter(visible=True).first.click(timeout=POPUP_CLICK_TIMEOUT)
+        except Exception:
+            # Includes the timeout raised when nothing matching becomes actionable in time
+            return False
+        
+        await asyncio.sleep(0.5)  # Wait for animation
+        return True
+    
+    async def dismiss_round(self, page: Page, strategies: List[Dict]) -> List[str]:
+        """Dismiss at most one popup per strategy, in strategy order; returns the dismissed names"""
+        dismissed = []
+        remaining = list(strategies)
+        
+        while remaining:
+            match = await self.find_visible_popup(page, remaining)
+            if not match:
+                break
+            
+            strategy, selector = match
+            remaining.remove(strategy)
+            # The next lookup re-checks visibility itself, so no extra settle time is needed here
+            if await self.click_popup_control(page, selector):
+                dismissed.append(strategy['name'])
+        
+        return dismissed
+    
     async def try_dismiss_popup(self, page: Page, strategy: Dict) -> bool:
         """Try to dismiss a popup using the given strategy"""
-        for selector in strategy['selectors']:
-            try:
-                # Check if element exists and is visible
-                element = await page.query_selector(selector)
-                if element:
-                    # Check if element is visible
-                    is_visible = await element.is_visible()
-                    if is_visible:
-                        # Try to click the element
-                        await element.click()
-                        await asyncio.sleep(0.5)  # Wait for animation
-                        return True
-                        
-            except Exception as e:
-                # Continue trying other selectors
-                continue
-        
-        return False
+        union = strategy.get('union') or ', '.join(strategy['selectors'])
+        return await self.click_popup_control(page, union)
     
     async def handle_overlay_popups(self, page: Page) -> bool:
         """Handle overlay popups that might block interactions"""
@@ -165,8 +310,19 @@ class PopupHandler:
             typer.echo(f"⚠️ Error handling overlay popups: {str(e)}")
             return False
     
+    async def install_context_policies(self, context: BrowserContext):
+        """Deny notification prompts and set the default action timeout once per browser context"""
+        # Granting an empty set leaves notifications denied for every origin (already-granted
+        # permissions such as geolocation are kept), so Chrome never raises the prompt
+        await context.grant_permissions([])
+        context.set_default_timeout(Config.BROWSER_TIMEOUT)
+        self.context_policies_installed = True
+    
     async def handle_notification_popups(self, page: Page) -> bool:
         """Handle browser notification permission popups"""
+        if self.context_policies_installed:
+            return False
+        
         try:
             # Set notification permission to denied to prevent popups
             context = page.context
@@ -211,25 +367,62 @@ class PopupHandler:
             typer.echo(f"⚠️ Page stability timeout: {str(e)}")
     
     async def dismiss_all_popups_continuously(self, page: Page, duration: int = 30):
-        """Continuously dismiss popups for a specified duration"""
+        """Dismiss popups for a specified duration, reacting to DOM changes instead of polling"""
         typer.echo(f"🔄 Monitoring for popups for {duration} seconds...")
         
-        start_time = asyncio.get_event_loop().time()
-        dismissed_count = 0
+        # Check most common popups
+        candidates = [
+            (strategy, selector)
+            for strategy in self.popup_strategies[:3]
+            for selector in strategy['selectors']
+        ]
+        observer_args = {
+            'binding': POPUP_BINDING,
+            'entries': [_selector_entry(selector) for _, selector in candidates],
+            'debounceMs': OBSERVER_DEBOUNCE_MS
+        }
         
-        while (asyncio.get_event_loop().time() - start_time) < duration:
+        async def install_observer(*_):
             try:
-                # Quick popup check
-                for strategy in self.popup_strategies[:3]:  # Check most common popups
-                    if await self.try_dismiss_popup(page, strategy):
-                        dismissed_count += 1
-                        typer.echo(f"✅ Auto-dismissed: {strategy['name']}")
-                
-                await asyncio.sleep(3)  # Check every 3 seconds
-                
+                await page.evaluate(OBSERVE_POPUPS_JS, observer_args)
             except Exception as e:
-                typer.echo(f"⚠️ Error in continuous monitoring: {str(e)}")
-                await asyncio.sleep(5)
+                typer.echo(f"⚠️ Error installing popup observer: {str(e)}")
+        
+        queue = self._popup_queues.get(page)
+        if queue is None:
+            queue = asyncio.Queue()
+            await page.expose_function(POPUP_BINDING, queue.put_nowait)
+            self._popup_queues[page] = queue
+            # A closed page never reports again; drop its queue so the handler does not keep it alive
+            page.once('close', lambda *_: self._popup_queues.pop(page, None))
+        while not queue.empty():
+            queue.get_nowait()
+        
+        # Observers die with their document, so reinstall after every navigation
+        page.on('domcontentloaded', install_observer)
+        await install_observer()
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + duration
+        dismissed_count = 0
+        
+        try:
+            while (remaining := deadline - loop.time()) > 0:
+                try:
+                    index = await asyncio.wait_for(queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                
+                strategy, selector = candidates[index]
+                if await self.click_popup_control(page, selector):
+                    dismissed_count += 1
+                    typer.echo(f"✅ Auto-dismissed: {strategy['name']}")
+        finally:
+            page.remove_listener('domcontentloaded', install_observer)
+            try:
+                await page.evaluate(STOP_OBSERVING_POPUPS_JS)
+            except Exception:
+                pass
         
         typer.echo(f"🏁 Popup monitoring completed. Dismissed {dismissed_count} popups.")
         return dismissed_count
@@ -256,24 +449,11 @@ class PopupHandler:
                 '[role="alertdialog"]'
             ]
             
-            for selector in popup_indicators:
-                elements = await page.query_selector_all(selector)
-                
-                for element in elements:
-                    is_visible = await element.is_visible()
-                    if is_visible:
-                        # Get element info
-                        tag_name = await element.evaluate('el => el.tagName')
-                        class_name = await element.get_attribute('class') or ''
-                        
-                        popup_info = {
-                            'selector': selector,
-                            'tag_name': tag_name,
-                            'class_name': class_name,
-                            'element': element
-                        }
-                        
-                        detected_popups.append(popup_info)
+            # One browser round trip for every selector, visibility check and attribute read
+            for popup_info in await page.evaluate(DETECT_POPUPS_JS, popup_indicators):
+                # Locators resolve lazily, so only popups that are acted on cost another round trip
+                popup_info['element'] = page.locator(popup_info['selector']).nth(popup_info.pop('index'))
+                detected_popups.append(popup_info)
             
             if detected_popups:
                 typer.echo(f"🔍 Detected {len(detected_popups)} potential popups")
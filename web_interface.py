@@ -4,11 +4,13 @@ Smart web interface for Ajio.com automation system with AI Vision.
 Provides a comprehensive dashboard showcasing AI-powered automation capabilities.
 """
 
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request, stream_with_context
+import hashlib
 import json
 import os
 import asyncio
 import threading
+import time
 from datetime import datetime
 from agents.login_agent import LoginAgent
 from agents.order_agent import OrderAgent
@@ -22,10 +24,139 @@ try:
 except ImportError as e:
     print(f"⚠️ AI agents not available: {e}")
     AI_AGENTS_AVAILABLE = False
+from utils.browser_pool import get_shared_browser
 from utils.database import init_database, get_database_info
+from utils.json_provider import install_json_provider
+from utils.http_compression import install_compression
 from config import Config
 
+# Redis lets every dashboard worker share cached API responses; without it they are cached in-process
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
 app = Flask(__name__)
+install_json_provider(app)
+install_compression(app)
+
+# The schema is created once at startup, whichever server imports the app, not on every request
+init_database()
+
+# Shared across requests; neither holds per-request state
+_config = Config()
+_reminder_agent = ReminderAgent()
+
+# The configuration is fixed for the life of the process, so the /api/config body is serialized once
+CONFIG_PAYLOAD = app.json.dumps({
+    'ajio_base_url': _config.AJIO_BASE_URL,
+    'timeouts': {
+        'browser': _config.BROWSER_TIMEOUT,
+        'page_load': _config.PAGE_LOAD_TIMEOUT,
+        'element': _config.ELEMENT_TIMEOUT
+    },
+    'features': {
+        'database_path': _config.DATABASE_PATH,
+        'return_period_days': _config.DEFAULT_RETURN_PERIOD_DAYS,
+        'urgent_threshold_days': _config.URGENT_DEADLINE_THRESHOLD_DAYS
+    }
+})
+CONFIG_ETAG = hashlib.sha1(CONFIG_PAYLOAD.encode()).hexdigest()
+
+# Dashboard polls re-use database info for this long instead of re-counting every table
+DB_INFO_TTL = 5.0  # seconds
+_db_info_cache = {'info': None, 'expires_at': 0.0}
+_db_info_lock = threading.Lock()
+
+def cached_database_info():
+    """get_database_info(), reused for DB_INFO_TTL seconds"""
+    with _db_info_lock:
+        now = time.monotonic()
+        if _db_info_cache['info'] is None or now >= _db_info_cache['expires_at']:
+            _db_info_cache['info'] = get_database_info()
+            _db_info_cache['expires_at'] = now + DB_INFO_TTL
+        return _db_info_cache['info']
+
+# The dashboard template takes no per-request data, so it is rendered once and then served as-is
+DASHBOARD_TEMPLATE_PATH = os.path.join(app.root_path, app.template_folder, 'dashboard.html')
+_dashboard_cache = {'html': None, 'mtime': None}
+
+# Parts of the /api/status body that are fixed for the life of the process
+STATUS_FEATURES = {
+    'browser_automation': True,
+    'order_scraping': True,
+    'return_management': True,
+    'deadline_reminders': True
+}
+STATUS_AGENTS = {
+    'login_agent': 'Available',
+    'smart_login_agent': 'Available',
+    'ai_vision_agent': 'Available',
+    'order_agent': 'Available', 
+    'return_agent': 'Available',
+    'reminder_agent': 'Available'
+}
+STATUS_AI_FEATURES = {
+    'groq_api': bool(os.getenv('GROQ_API_KEY')),
+    'intelligent_login_detection': AI_AGENTS_AVAILABLE,
+    'adaptive_element_finding': AI_AGENTS_AVAILABLE,
+    'natural_language_analysis': AI_AGENTS_AVAILABLE,
+    'ai_agents_available': AI_AGENTS_AVAILABLE
+}
+
+# Serialized /api/status bodies are reused for this long
+STATUS_CACHE_TTL = 3  # seconds
+
+# Redis calls run on request threads and the automation loop, so an unreachable server fails fast
+REDIS_TIMEOUT = 1.0  # seconds
+
+REDIS_URL = os.getenv('REDIS_URL')
+_redis = redis.Redis.from_url(
+    REDIS_URL, decode_responses=True, socket_timeout=REDIS_TIMEOUT, socket_connect_timeout=REDIS_TIMEOUT
+) if REDIS_AVAILABLE and REDIS_URL else None
+_response_cache = {}  # key -> (expires_at, payload), used when Redis is not configured
+_response_cache_lock = threading.Lock()
+
+def get_cached_response(key):
+    """Return a cached JSON payload, or None when missing, expired or Redis is unreachable"""
+    if _redis is not None:
+        try:
+            return _redis.get(key)
+        except redis.RedisError:
+            return None
+    
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+    if entry and time.monotonic() < entry[0]:
+        return entry[1]
+    return None
+
+def set_cached_response(key, ttl, payload):
+    """Cache a JSON payload for ttl seconds"""
+    if _redis is not None:
+        try:
+            _redis.setex(key, ttl, payload)
+        except redis.RedisError:
+            pass
+        return
+    
+    with _response_cache_lock:
+        _response_cache[key] = (time.monotonic() + ttl, payload)
+
+def invalidate_order_caches():
+    """Drop cached responses and database info that depend on the saved orders"""
+    with _db_info_lock:
+        _db_info_cache['expires_at'] = 0.0
+    
+    if _redis is not None:
+        try:
+            _redis.delete('api:status')
+        except redis.RedisError:
+            pass
+    else:
+        with _response_cache_lock:
+            _response_cache.pop('api:status', None)
 
 # Global variables to track automation status
 automation_status = {
@@ -36,57 +167,130 @@ automation_status = {
     'error': None
 }
 
+# Bumped on every status change; event-stream clients wait on the condition instead of polling
+_status_changed = threading.Condition()
+_status_version = 0
+
+# automation_status serialized at its last update; readers take this string and never touch the dict
+_status_payload = app.json.dumps(automation_status)
+
+# Automation runs, real and demo, are tasks on one long-lived event loop instead of a thread and loop each
+_automation_loop = None
+_automation_loop_lock = threading.Lock()
+
+def get_automation_loop():
+    """Get the shared automation event loop, starting its thread on first use"""
+    global _automation_loop
+    
+    with _automation_loop_lock:
+        if _automation_loop is None:
+            _automation_loop = asyncio.new_event_loop()
+            threading.Thread(target=_automation_loop.run_forever, name='automation-loop', daemon=True).start()
+        return _automation_loop
+
+# An idle event stream sends a comment this often so proxies keep the connection open
+STATUS_KEEPALIVE_INTERVAL = 15  # seconds
+
+# Status updates landing within this window of each other reach a stream as a single event
+STATUS_COALESCE_INTERVAL = 0.05  # seconds
+
+# With Redis configured, every worker reads the latest status from this key and streams the channel
+STATUS_KEY = 'automation:status'
+STATUS_CHANNEL = 'automation:events'
+
+def _apply_status(**fields):
+    """Update automation_status and its snapshot and wake local streams; the caller holds _status_changed"""
+    global _status_version, _status_payload
+    
+    automation_status.update(fields)
+    _status_payload = app.json.dumps(automation_status)
+    _status_version += 1
+    _status_changed.notify_all()
+    return _status_payload, _status_version
+
+def set_automation_status(**fields):
+    """Update automation_status and its serialized snapshot, then wake every client streaming status events"""
+    with _status_changed:
+        payload, version = _apply_status(**fields)
+    
+    # Published after releasing the condition so a slow Redis never holds up local streams.
+    # The condition's lock is re-entrant: never call this while already holding it
+    publish_status(payload, version)
+
+# Serializes Redis publishes; a snapshot older than the last one published is dropped
+_status_publish_lock = threading.Lock()
+_published_version = -1
+
+def publish_status(payload, version):
+    """Store a status snapshot in Redis and fan it out to every worker's event streams"""
+    global _published_version
+    
+    if _redis is None:
+        return
+    
+    with _status_publish_lock:
+        if version <= _published_version:
+            return
+        _published_version = version
+        try:
+            pipeline = _redis.pipeline()
+            pipeline.set(STATUS_KEY, payload)
+            pipeline.publish(STATUS_CHANNEL, payload)
+            pipeline.execute()
+        except redis.RedisError as e:
+            print(f"⚠️ Could not publish automation status: {str(e)}")
+
+# A fresh process starts idle; overwrite whatever a crashed or restarted run left in Redis
+publish_status(_status_payload, _status_version)
+
+def current_status_payload():
+    """Latest status snapshot, shared through Redis when configured, else this process's own"""
+    if _redis is not None:
+        try:
+            payload = _redis.get(STATUS_KEY)
+            if payload:
+                return payload
+        except redis.RedisError:
+            pass
+    return _status_payload
+
 @app.route('/')
 def dashboard():
     """Main dashboard showing system status and features"""
-    return render_template('dashboard.html')
+    # In debug mode a changed template file is picked up on the next request
+    mtime = os.path.getmtime(DASHBOARD_TEMPLATE_PATH) if app.debug else None
+    if _dashboard_cache['html'] is None or mtime != _dashboard_cache['mtime']:
+        _dashboard_cache['html'] = render_template('dashboard.html')
+        _dashboard_cache['mtime'] = mtime
+    return app.response_class(_dashboard_cache['html'], mimetype='text/html')
 
 @app.route('/api/status')
 def api_status():
     """API endpoint to get system status"""
+    cached = get_cached_response('api:status')
+    if cached:
+        return app.response_class(cached, mimetype='application/json')
+    
     try:
-        # Initialize database
-        init_database()
-        
-        # Get database info
-        db_info = get_database_info()
-        
-        # Get orders count
-        reminder_agent = ReminderAgent()
-        orders = reminder_agent.get_all_orders()
+        # Get database info; the orders count is a live COUNT(*)
+        db_info = cached_database_info()
         
         status = {
             'status': 'running',
             'timestamp': datetime.now().isoformat(),
             'database': {
                 'initialized': True,
-                'orders_count': len(orders) if orders else 0,
+                'orders_count': _reminder_agent.count_orders(),
                 'tables': db_info.get('tables', [])
             },
-            'features': {
-                'browser_automation': True,
-                'order_scraping': True,
-                'return_management': True,
-                'deadline_reminders': True
-            },
-            'agents': {
-                'login_agent': 'Available',
-                'smart_login_agent': 'Available',
-                'ai_vision_agent': 'Available',
-                'order_agent': 'Available', 
-                'return_agent': 'Available',
-                'reminder_agent': 'Available'
-            },
-            'ai_features': {
-                'groq_api': bool(os.getenv('GROQ_API_KEY')),
-                'intelligent_login_detection': AI_AGENTS_AVAILABLE,
-                'adaptive_element_finding': AI_AGENTS_AVAILABLE,
-                'natural_language_analysis': AI_AGENTS_AVAILABLE,
-                'ai_agents_available': AI_AGENTS_AVAILABLE
-            }
+            'features': STATUS_FEATURES,
+            'agents': STATUS_AGENTS,
+            'ai_features': STATUS_AI_FEATURES
         }
         
-        return jsonify(status)
+        payload = app.json.dumps(status)
+        set_cached_response('api:status', STATUS_CACHE_TTL, payload)
+        return app.response_class(payload, mimetype='application/json')
         
     except Exception as e:
         return jsonify({
@@ -97,33 +301,60 @@ def api_status():
 
 @app.route('/api/orders')
 def api_orders():
-    """API endpoint to get saved orders"""
+    """API endpoint to get saved orders, streamed row by row"""
+    if request.args.get('stream') == '1':
+        return api_orders_ndjson()
+    
+    # Unchanged orders since the client's last fetch: answer 304 without reading any rows
+    version = _reminder_agent.get_orders_version()
+    etag = f"orders-{version}"
+    if version is not None and request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag, weak=True)
+        return response
+    
     try:
-        init_database()
-        reminder_agent = ReminderAgent()
-        orders = reminder_agent.get_all_orders()
-        
-        return jsonify({
-            'orders': orders or [],
-            'count': len(orders) if orders else 0
-        })
+        def generate():
+            # Same {"orders": [...], "count": N} body as before, without holding every order in memory
+            yield '{"orders":['
+            count = 0
+            for order in _reminder_agent.iter_orders():
+                yield (',' if count else '') + app.json.dumps(order)
+                count += 1
+            yield f'],"count":{count}}}'
+        
+        response = Response(stream_with_context(generate()), mimetype='application/json')
+        if version is not None:
+            response.set_etag(etag, weak=True)
+        return response
         
     except Exception as e:
         return jsonify({
             'error': str(e)
         }), 500
 
+@app.route('/api/orders.ndjson')
+def api_orders_ndjson():
+    """API endpoint to stream saved orders as newline-delimited JSON, one {"result": order} line per row"""
+    def generate():
+        # Failures after the first line can no longer change the status code, so they become an error line
+        try:
+            for order in _reminder_agent.iter_orders():
+                yield app.json.dumps({'result': order}) + '\n'
+        except Exception as e:
+            yield app.json.dumps({'error': str(e)}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @app.route('/api/reminders')
 def api_reminders():
     """API endpoint to check reminders"""
     try:
-        init_database()
-        reminder_agent = ReminderAgent()
-        reminders = reminder_agent.check_reminders()
+        reminders = _reminder_agent.check_reminders() or []
         
         return jsonify({
-            'reminders': reminders or [],
-            'count': len(reminders) if reminders else 0
+            'reminders': reminders,
+            'count': len(reminders)
         })
         
     except Exception as e:
@@ -134,27 +365,12 @@ def api_reminders():
 @app.route('/api/config')
 def api_config():
     """API endpoint to get system configuration"""
-    try:
-        config = Config()
-        
-        return jsonify({
-            'ajio_base_url': config.AJIO_BASE_URL,
-            'timeouts': {
-                'browser': config.BROWSER_TIMEOUT,
-                'page_load': config.PAGE_LOAD_TIMEOUT,
-                'element': config.ELEMENT_TIMEOUT
-            },
-            'features': {
-                'database_path': config.DATABASE_PATH,
-                'return_period_days': config.DEFAULT_RETURN_PERIOD_DAYS,
-                'urgent_threshold_days': config.URGENT_DEADLINE_THRESHOLD_DAYS
-            }
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'error': str(e)
-        }), 500
+    if CONFIG_ETAG in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = app.response_class(CONFIG_PAYLOAD, mimetype='application/json')
+    response.set_etag(CONFIG_ETAG)
+    return response
 
 @app.route('/api/automation/start', methods=['POST'])
 def start_automation():
@@ -171,28 +387,27 @@ def start_automation():
         if not phone_number:
             return jsonify({'error': 'Phone number is required'}), 400
         
-        if automation_status['running']:
-            return jsonify({'error': 'Automation is already running'}), 400
-        
-        # Start automation in background thread
-        automation_status['running'] = True
-        automation_status['status'] = 'starting'
-        automation_status['message'] = 'Initializing automation...'
-        automation_status['error'] = None
-        automation_status['orders'] = []
+        # Check and claim under the status lock so two requests cannot both start a run,
+        # then publish the claim once the lock is released
+        with _status_changed:
+            if automation_status['running']:
+                return jsonify({'error': 'Automation is already running'}), 400
+            
+            payload, version = _apply_status(
+                running=True,
+                status='starting',
+                message='Initializing automation...',
+                error=None,
+                orders=[]
+            )
+        publish_status(payload, version)
         
+        # Start automation in the background
         if demo_mode:
-            thread = threading.Thread(
-                target=run_demo_automation, 
-                args=(phone_number, command)
-            )
+            workflow = demo_automation_workflow(phone_number, command)
         else:
-            thread = threading.Thread(
-                target=run_automation, 
-                args=(phone_number, command, headless)
-            )
-        thread.daemon = True
-        thread.start()
+            workflow = automation_workflow(phone_number, command, headless)
+        asyncio.run_coroutine_threadsafe(workflow, get_automation_loop())
         
         return jsonify({
             'success': True,
@@ -200,119 +415,181 @@ def start_automation():
         })
         
     except Exception as e:
-        automation_status['running'] = False
-        automation_status['error'] = str(e)
+        set_automation_status(
+            running=False,
+            error=str(e)
+        )
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/automation/status')
 def automation_status_api():
     """Get current automation status"""
-    return jsonify(automation_status)
+    return app.response_class(current_status_payload(), mimetype='application/json')
+
+def local_status_events():
+    """Server-sent events for status changes made in this process"""
+    version = None
+    while True:
+        with _status_changed:
+            changed = _status_changed.wait_for(lambda: _status_version != version, timeout=STATUS_KEEPALIVE_INTERVAL)
+        if not changed:
+            yield ': keepalive\n\n'
+            continue
+        
+        if version is not None:
+            time.sleep(STATUS_COALESCE_INTERVAL)
+        with _status_changed:
+            version = _status_version
+            snapshot = _status_payload
+        
+        yield f'data: {snapshot}\n\n'
+
+def redis_status_events():
+    """Server-sent events for status changes published by any worker"""
+    pubsub = _redis.pubsub(ignore_subscribe_messages=True)
+    try:
+        # Subscribe before reading the snapshot so no change in between is missed
+        pubsub.subscribe(STATUS_CHANNEL)
+        yield f'data: {current_status_payload()}\n\n'
+        
+        while True:
+            message = pubsub.get_message(timeout=STATUS_KEEPALIVE_INTERVAL)
+            if message is None:
+                yield ': keepalive\n\n'
+                continue
+            
+            # Only the newest snapshot published within the window is sent
+            time.sleep(STATUS_COALESCE_INTERVAL)
+            while (newer := pubsub.get_message()) is not None:
+                message = newer
+            
+            yield f"data: {message['data']}\n\n"
+    finally:
+        pubsub.close()
+
+@app.route('/api/automation/events')
+def automation_events():
+    """Push automation status to the dashboard as server-sent events, starting with the current snapshot"""
+    events = redis_status_events() if _redis is not None else local_status_events()
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache'}
+    )
 
 @app.route('/api/automation/stop', methods=['POST'])
 def stop_automation():
     """Stop the automation process"""
     global automation_status
     
-    automation_status['running'] = False
-    automation_status['status'] = 'stopped'
-    automation_status['message'] = 'Automation stopped by user'
+    set_automation_status(
+        running=False,
+        status='stopped',
+        message='Automation stopped by user'
+    )
     
     return jsonify({
         'success': True,
         'message': 'Automation stopped'
     })
 
-def run_automation(phone_number, command, headless):
-    """Run the automation workflow in background"""
-    global automation_status
-    
+async def automation_workflow(phone_number, command, headless):
+    """Run the automation workflow on the shared automation loop"""
     try:
         # Initialize database
-        automation_status['status'] = 'initializing'
-        automation_status['message'] = 'Setting up database...'
+        set_automation_status(
+            status='initializing',
+            message='Setting up database...'
+        )
         init_database()
         
         # Initialize agents
-        automation_status['message'] = 'Starting browser...'
+        set_automation_status(message='Starting browser...')
         login_agent = LoginAgent(headless=headless)
         order_agent = OrderAgent()
         return_agent = ReturnAgent()
         reminder_agent = ReminderAgent()
+    
+    except Exception as e:
+        set_automation_status(
+            running=False,
+            error=str(e),
+            status='error',
+            message=f'Failed to run automation: {str(e)}'
+        )
+        return
+    
+    try:
+        # Step 1: Start browser
+        set_automation_status(
+            status='browser_starting',
+            message='Opening browser...'
+        )
+        try:
+            # The pooled browser stays up between runs; each run only opens its own page and context
+            _, browser = await get_shared_browser(headless)
+            await login_agent.start_browser(browser)
+            set_automation_status(message='Browser started successfully. Navigating to Ajio.com...')
+        except Exception as browser_error:
+            if "Host system is missing dependencies" in str(browser_error) or "BrowserType.launch" in str(browser_error):
+                set_automation_status(error="REAL AUTOMATION NOT AVAILABLE: This Replit environment lacks the system dependencies needed for browser automation. To actually login to Ajio.com and scrape your real orders, you would need to run this on a local machine or server with proper browser support. The demo mode shows how it would work.")
+            else:
+                set_automation_status(error=f"Browser startup failed: {str(browser_error)}")
+            return
+        
+        # Step 2: Login
+        set_automation_status(
+            status='logging_in',
+            message='Navigating to Ajio.com and logging in...'
+        )
+        success = await login_agent.login(phone_number)
+        
+        if not success:
+            set_automation_status(error='Login failed')
+            return
+        
+        # Step 3: Scrape orders
+        set_automation_status(
+            status='scraping_orders',
+            message='Extracting order information...'
+        )
+        orders = await order_agent.scrape_orders(login_agent.page) or []
+        
+        set_automation_status(orders=orders)
+        
+        if orders:
+            # Save orders to database
+            set_automation_status(message=f'Saving {len(orders)} orders to database...')
+            reminder_agent.save_orders(orders)
+            invalidate_order_caches()
+        
+        # Step 4: Handle command if provided
+        if command and command.strip():
+            set_automation_status(
+                status='processing_command',
+                message=f'Processing command: {command}'
+            )
+            await return_agent.process_command(login_agent.page, command)
         
-        # Run the automation workflow
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        async def automation_workflow():
-            try:
-                # Step 1: Start browser
-                automation_status['status'] = 'browser_starting'
-                automation_status['message'] = 'Opening browser...'
-                try:
-                    await login_agent.start_browser()
-                    automation_status['message'] = 'Browser started successfully. Navigating to Ajio.com...'
-                except Exception as browser_error:
-                    if "Host system is missing dependencies" in str(browser_error) or "BrowserType.launch" in str(browser_error):
-                        automation_status['error'] = "REAL AUTOMATION NOT AVAILABLE: This Replit environment lacks the system dependencies needed for browser automation. To actually login to Ajio.com and scrape your real orders, you would need to run this on a local machine or server with proper browser support. The demo mode shows how it would work."
-                    else:
-                        automation_status['error'] = f"Browser startup failed: {str(browser_error)}"
-                    return
-                
-                # Step 2: Login
-                automation_status['status'] = 'logging_in'
-                automation_status['message'] = 'Navigating to Ajio.com and logging in...'
-                success = await login_agent.login(phone_number)
-                
-                if not success:
-                    automation_status['error'] = 'Login failed'
-                    return
-                
-                # Step 3: Scrape orders
-                automation_status['status'] = 'scraping_orders'
-                automation_status['message'] = 'Extracting order information...'
-                orders = await order_agent.scrape_orders(login_agent.page)
-                
-                automation_status['orders'] = orders or []
-                
-                if orders:
-                    # Save orders to database
-                    automation_status['message'] = f'Saving {len(orders)} orders to database...'
-                    for order in orders:
-                        reminder_agent.save_order(order)
-                
-                # Step 4: Handle command if provided
-                if command and command.strip():
-                    automation_status['status'] = 'processing_command'
-                    automation_status['message'] = f'Processing command: {command}'
-                    await return_agent.process_command(login_agent.page, command)
-                
-                # Step 5: Complete
-                automation_status['status'] = 'completed'
-                automation_status['message'] = f'Automation completed successfully! Found {len(orders or [])} orders.'
-                
-            except Exception as e:
-                automation_status['error'] = str(e)
-                automation_status['status'] = 'error'
-                automation_status['message'] = f'Error: {str(e)}'
-            
-            finally:
-                await login_agent.close_browser()
-                automation_status['running'] = False
-        
-        loop.run_until_complete(automation_workflow())
-        
+        # Step 5: Complete
+        set_automation_status(
+            status='completed',
+            message=f'Automation completed successfully! Found {len(orders)} orders.'
+        )
+    
     except Exception as e:
-        automation_status['running'] = False
-        automation_status['error'] = str(e)
-        automation_status['status'] = 'error'
-        automation_status['message'] = f'Failed to run automation: {str(e)}'
-
-def run_demo_automation(phone_number, command):
-    """Run a demo automation workflow that simulates the real process"""
-    global automation_status
-    import time
+        set_automation_status(
+            error=str(e),
+            status='error',
+            message=f'Error: {str(e)}'
+        )
     
+    finally:
+        await login_agent.close_browser()
+        set_automation_status(running=False)
+
+async def demo_automation_workflow(phone_number, command):
+    """Run a demo automation workflow that simulates the real process on the shared automation loop"""
     try:
         # Demo data for simulation
         demo_orders = [
@@ -343,57 +620,70 @@ def run_demo_automation(phone_number, command):
         ]
         
         # Initialize database
-        automation_status['status'] = 'initializing'
-        automation_status['message'] = 'Setting up database...'
-        time.sleep(1)
+        set_automation_status(
+            status='initializing',
+            message='Setting up database...'
+        )
+        await asyncio.sleep(1)
         init_database()
         
         # Simulate browser starting
-        automation_status['status'] = 'browser_starting'
-        automation_status['message'] = 'Opening browser (Demo Mode)...'
-        time.sleep(2)
+        set_automation_status(
+            status='browser_starting',
+            message='Opening browser (Demo Mode)...'
+        )
+        await asyncio.sleep(2)
         
         # Simulate login process
-        automation_status['status'] = 'logging_in'
-        automation_status['message'] = f'Logging in with phone {phone_number}...'
-        time.sleep(3)
+        set_automation_status(
+            status='logging_in',
+            message=f'Logging in with phone {phone_number}...'
+        )
+        await asyncio.sleep(3)
         
         # Simulate OTP entry
-        automation_status['message'] = 'Simulating OTP verification...'
-        time.sleep(2)
+        set_automation_status(message='Simulating OTP verification...')
+        await asyncio.sleep(2)
         
         # Simulate order scraping
-        automation_status['status'] = 'scraping_orders'
-        automation_status['message'] = 'Extracting order information...'
-        time.sleep(2)
+        set_automation_status(
+            status='scraping_orders',
+            message='Extracting order information...'
+        )
+        await asyncio.sleep(2)
         
-        automation_status['orders'] = demo_orders
+        set_automation_status(orders=demo_orders)
         
         # Save demo orders to database
-        automation_status['message'] = f'Saving {len(demo_orders)} orders to database...'
-        reminder_agent = ReminderAgent()
-        for order in demo_orders:
-            reminder_agent.save_order(order)
-        time.sleep(1)
+        set_automation_status(message=f'Saving {len(demo_orders)} orders to database...')
+        _reminder_agent.save_orders(demo_orders)
+        invalidate_order_caches()
+        await asyncio.sleep(1)
         
         # Handle command if provided
         if command and command.strip():
-            automation_status['status'] = 'processing_command'
-            automation_status['message'] = f'Processing command: {command} (Demo Mode)'
-            time.sleep(2)
-            automation_status['message'] = f'Command "{command}" processed successfully (simulated)'
+            set_automation_status(
+                status='processing_command',
+                message=f'Processing command: {command} (Demo Mode)'
+            )
+            await asyncio.sleep(2)
+            set_automation_status(message=f'Command "{command}" processed successfully (simulated)')
         
         # Complete
-        automation_status['status'] = 'completed'
-        automation_status['message'] = f'Demo automation completed! Found {len(demo_orders)} orders. (This was a simulation - no real browser interaction occurred)'
+        set_automation_status(
+            status='completed',
+            message=f'Demo automation completed! Found {len(demo_orders)} orders. (This was a simulation - no real browser interaction occurred)'
+        )
         
     except Exception as e:
-        automation_status['error'] = str(e)
-        automation_status['status'] = 'error'
-        automation_status['message'] = f'Demo failed: {str(e)}'
+        set_automation_status(
+            error=str(e),
+            status='error',
+            message=f'Demo failed: {str(e)}'
+        )
     
     finally:
-        automation_status['running'] = False
+        set_automation_status(running=False)
 
 # Add AI vision test endpoint
 @app.route('/api/ai/test', methods=['POST'])
@@ -429,8 +719,6 @@ def test_ai_vision():
         }), 500
 
 if __name__ == '__main__':
-    # Initialize database on startup
-    init_database()
     print("🤖 Ajio.com AI-Powered Automation System - Web Interface")
     print("=" * 70)
     print("🧠 Now featuring Groq AI-powered intelligent login detection!")
@@ -457,5 +745,9 @@ if __name__ == '__main__':
     print("   • python run_stealth.py  (Stealth mode)")
     print("   • python run_local.py    (Standard mode)")
     print()
+    print("🏭 Production: gunicorn --worker-class gthread --workers 1 --threads 32 --bind 0.0.0.0:5000 wsgi:app")
+    print()
     
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    # One thread per request; each thread gets its own pooled SQLite connection,
+    # so concurrent dashboard polls read in parallel under WAL
+    app.run(host='0.0.0.0', port=5000, debug=True, threaded=True)
\ No newline at end of file
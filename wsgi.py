@@ -0,0 +1,11 @@
+"""
+WSGI entry point for the automation dashboard.
+Serve it with gunicorn's threaded worker in a single process, e.g.
+
+    gunicorn --worker-class gthread --workers 1 --threads 32 --bind 0.0.0.0:5000 wsgi:app
+
+Automation status and the automation event loop live in the process, so the dashboard
+must not be split across several workers; threads give the request concurrency instead.
+"""
+
+from web_interface import app  # noqa: F401